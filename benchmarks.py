@@ -0,0 +1,400 @@
+"""Timing comparisons for the project's heavier routines.
+
+Run from the repository root, e.g. `python benchmarks.py sweep_backends`.
+"""
+import itertools
+import os
+import sys
+import tempfile
+import tracemalloc
+from functools import partial
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import unidecode
+from statsmodels.formula.api import ols
+
+import cleaning
+import corrcache
+import crossval
+import fastols
+import modeling
+import outliers
+import selection
+import utils
+
+SCRUBBED_PATH = os.path.join("data", "scrubbed_kc_house_data.pkl.bz2")
+
+
+def _time(func, *args, repeat=1, **kwargs) -> float:
+    """Returns the best wall time of `repeat` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func(*args, **kwargs)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def sweep_backends(
+    path=SCRUBBED_PATH,
+    n_vars=(1, 2, 3),
+    backends=modeling.BACKENDS,
+    engine="formula",
+    jobs=os.cpu_count(),
+) -> pd.DataFrame:
+    """Time `modeling.ols_sweep` with each execution backend.
+
+    Args:
+        path (str, optional): Pickled DataFrame to sweep. Defaults to SCRUBBED_PATH.
+        n_vars (tuple, optional): Sweep sizes to time. Defaults to (1, 2, 3).
+        backends (tuple, optional): Backends to compare. Defaults to modeling.BACKENDS.
+        engine (str, optional): Sweep engine. Defaults to "formula".
+        jobs (int, optional): Number of workers to create. Defaults to os.cpu_count().
+
+    Returns:
+        pd.DataFrame: Seconds per sweep, indexed by `n_vars`.
+    """
+    data = pd.read_pickle(path)
+    times = pd.DataFrame(index=pd.Index(n_vars, name="n_vars"), columns=backends)
+    for n in n_vars:
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as dst:
+                times.loc[n, backend] = _time(
+                    modeling.ols_sweep,
+                    data,
+                    "price",
+                    n_vars=n,
+                    dst=dst,
+                    jobs=jobs,
+                    engine=engine,
+                    backend=backend,
+                )
+    return times.astype(float)
+
+
+def summarize_cost(path=SCRUBBED_PATH, n_vars=3, n_models=50) -> pd.Series:
+    """Time `modeling.summarize` per model, with and without the shortcuts.
+
+    "rendered" also renders the text summary and recomputes the exog
+    correlations for each model, as `summarize` used to. Models are refit for
+    every mode so that no statsmodels cache is shared between modes.
+
+    Args:
+        path (str, optional): Pickled DataFrame to model. Defaults to SCRUBBED_PATH.
+        n_vars (int, optional): Number of predictors per model. Defaults to 3.
+        n_models (int, optional): Number of models to summarize. Defaults to 50.
+
+    Returns:
+        pd.Series: Milliseconds per model, indexed by mode.
+    """
+    data = pd.read_pickle(path)
+    terms = modeling._sweep_terms(data, "price")
+    combos = itertools.islice(itertools.combinations(terms, n_vars), n_models)
+    formulae = [f"price~{'+'.join(x)}" for x in combos]
+    corr = fastols.design_corr(data, terms)
+
+    def rendered(model):
+        model.summary()
+        return modeling.summarize(model)
+
+    modes = dict(
+        rendered=rendered,
+        full=partial(modeling.summarize, corr=corr),
+        fit_only=partial(
+            modeling.summarize,
+            fields=("rsquared", "rsquared_adj", "fval", "f_pval", "nobs"),
+        ),
+    )
+    times = pd.Series(0.0, index=pd.Index(modes, name="mode"), name="ms_per_model")
+    for mode, func in modes.items():
+        for formula in formulae:
+            model = ols(formula, data).fit()
+            times[mode] += _time(func, model)
+    return times / len(formulae) * 1000
+
+
+def iqr_engines(path=SCRUBBED_PATH, repeat=5) -> pd.DataFrame:
+    """Time the vectorized IQR functions against column-by-column `apply`.
+
+    Args:
+        path (str, optional): Pickled DataFrame to process. Defaults to SCRUBBED_PATH.
+        repeat (int, optional): Timing repetitions (best is kept). Defaults to 5.
+
+    Returns:
+        pd.DataFrame: Milliseconds per call, indexed by function.
+    """
+    data = pd.read_pickle(path).select_dtypes("number")
+    funcs = dict(
+        iqr_outliers=(outliers.iqr_outliers, dict()),
+        iqr_clip=(outliers.iqr_clip, dict(silent=True)),
+        iqr_winsorize=(outliers.iqr_winsorize, dict(silent=True)),
+    )
+    times = pd.DataFrame(
+        index=pd.Index(funcs, name="func"), columns=["column_apply", "vectorized"]
+    )
+    for name, (func, kwargs) in funcs.items():
+        times.loc[name, "column_apply"] = _time(
+            data.apply, func, repeat=repeat, **kwargs
+        )
+        times.loc[name, "vectorized"] = _time(func, data, repeat=repeat, **kwargs)
+    times = times.astype(float) * 1000
+    times["speedup"] = times["column_apply"] / times["vectorized"]
+    return times
+
+
+def z_engines(path=SCRUBBED_PATH, repeat=5) -> pd.DataFrame:
+    """Compare robust (median/MAD) z-scores with `StandardScaler` z-scores.
+
+    Args:
+        path (str, optional): Pickled DataFrame to process. Defaults to SCRUBBED_PATH.
+        repeat (int, optional): Timing repetitions (best is kept). Defaults to 5.
+
+    Returns:
+        pd.DataFrame: Milliseconds per call and outliers found, by function.
+    """
+    data = pd.read_pickle(path).select_dtypes("number")
+    funcs = dict(z_outliers=outliers.z_outliers, robust_z_outliers=outliers.robust_z_outliers)
+    times = pd.DataFrame(index=pd.Index(funcs, name="func"), columns=["ms", "n_outliers"])
+    for name, func in funcs.items():
+        times.loc[name, "ms"] = _time(func, data, repeat=repeat) * 1000
+        times.loc[name, "n_outliers"] = func(data).to_numpy().sum()
+    return times.astype(float)
+
+
+def gq_engines(
+    path=SCRUBBED_PATH,
+    formulae=("price~sqft_living+C(grade)+C(view)", "price~sqft_living+C(zipcode)"),
+) -> pd.DataFrame:
+    """Time `modeling.goldfeld_quandt` with each engine.
+
+    Args:
+        path (str, optional): Pickled DataFrame. Defaults to SCRUBBED_PATH.
+        formulae (tuple, optional): Models to test. Defaults to a small model
+            and one with every zipcode dummy.
+
+    Returns:
+        pd.DataFrame: Seconds per call, indexed by formula, with a column per engine.
+    """
+    data = pd.read_pickle(path)
+    times = dict()
+    for formula in formulae:
+        model = ols(formula, data).fit()
+        times[formula] = {
+            x: _time(modeling.goldfeld_quandt, model, engine=x)
+            for x in ("statsmodels", "native")
+        }
+    return pd.DataFrame.from_dict(times, orient="index")
+
+
+def diagnostics_cost(path=SCRUBBED_PATH, n_vars=2) -> pd.Series:
+    """Time White and GQ tests on every model of a sweep.
+
+    Args:
+        path (str, optional): Pickled DataFrame. Defaults to SCRUBBED_PATH.
+        n_vars (int, optional): Number of predictors per model. Defaults to 2.
+
+    Returns:
+        pd.Series: Seconds for all models, indexed by method.
+    """
+    data = pd.read_pickle(path).select_dtypes("number")
+    terms = modeling._sweep_terms(data, "price")
+    combos = list(itertools.combinations(terms, n_vars))
+    formulae = [f"price~{'+'.join(x)}" for x in combos]
+    models = [ols(x, data).fit() for x in formulae]
+
+    def statsmodels_tests():
+        for model in models:
+            modeling.white(model)
+            modeling.gq_summary(model)
+
+    def sweep(tests):
+        gram = fastols.GramOLS(data, "price", terms)
+        for _ in gram.sweep(combos, tests=tests):
+            pass
+
+    times = dict(
+        statsmodels=_time(statsmodels_tests),
+        gram_sweep=_time(sweep, ()),
+        gram_sweep_white_gq=_time(sweep, ("white", "gq")),
+    )
+    return pd.Series(times, name="seconds")
+
+
+def _process_strings_elementwise(strings: pd.Series) -> pd.Series:
+    """The former `cleaning.process_strings`, which works element by element."""
+    strings = strings.str.lower()
+    strings = strings.str.replace(cleaning.RE_PUNCT, "", regex=True)
+    strings = strings.str.replace(cleaning.RE_WHITESPACE, " ", regex=True)
+    return strings.map(unidecode.unidecode, na_action="ignore")
+
+
+def process_strings_cost(path=SCRUBBED_PATH, n_rows=1_000_000) -> pd.Series:
+    """Time `cleaning.process_strings` on a large column with few uniques.
+
+    Args:
+        path (str, optional): Pickled DataFrame with a "nearby_city" column.
+            Defaults to SCRUBBED_PATH.
+        n_rows (int, optional): Rows to sample with replacement. Defaults to 1_000_000.
+
+    Returns:
+        pd.Series: Seconds per call, indexed by engine.
+    """
+    cities = pd.read_pickle(path)["nearby_city"].astype(str)
+    cities = cities.sample(n_rows, replace=True, random_state=0) + ", WA"
+    times = dict(
+        elementwise=_time(_process_strings_elementwise, cities),
+        factorized=_time(cleaning.process_strings, cities),
+        factorized_category=_time(cleaning.process_strings, cities, dtype="category"),
+    )
+    return pd.Series(times, name="seconds")
+
+
+def _transform_stepwise(data: pd.DataFrame, pipe: list) -> pd.DataFrame:
+    """The former `utils.transform`, which allocates an array per step."""
+    tr = data.to_numpy()
+    for func in pipe:
+        tr = func(tr)
+    return pd.DataFrame(tr, index=data.index, columns=data.columns)
+
+
+def transform_cost(path=SCRUBBED_PATH, n_rows=1_000_000, repeat=3) -> pd.Series:
+    """Time `utils.transform` on a chain of ufuncs against the stepwise version.
+
+    Args:
+        path (str, optional): Pickled DataFrame. Defaults to SCRUBBED_PATH.
+        n_rows (int, optional): Rows to sample with replacement. Defaults to 1_000_000.
+        repeat (int, optional): Calls to time, keeping the best. Defaults to 3.
+
+    Returns:
+        pd.Series: Seconds per call, indexed by engine.
+    """
+    data = pd.read_pickle(path).select_dtypes("number").astype(np.float64)
+    data = data.sample(n_rows, replace=True, random_state=0)
+    pipe = [np.abs, np.log1p, np.sqrt, np.square, np.expm1]
+    times = dict(
+        stepwise=_time(_transform_stepwise, data, pipe, repeat=repeat),
+        fused=_time(utils.transform, data, pipe, silent=True, repeat=repeat),
+        fused_subset=_time(
+            utils.transform,
+            data,
+            pipe,
+            columns=data.columns[:3],
+            silent=True,
+            repeat=repeat,
+        ),
+    )
+    return pd.Series(times, name="seconds")
+
+
+def selection_cost(path=SCRUBBED_PATH) -> pd.Series:
+    """Time RFE and forward selection with each engine.
+
+    The native engine is timed cold, then warm, when the cached path answers
+    every `n_features` without refitting.
+
+    Args:
+        path (str, optional): Pickled DataFrame. Defaults to SCRUBBED_PATH.
+
+    Returns:
+        pd.Series: Seconds for every `n_features`, indexed by method.
+    """
+    data = pd.read_pickle(path)
+    n_total = data.drop(columns="price").select_dtypes("number").columns.size
+
+    def rank_all(func, engine):
+        for n_features in range(1, n_total):
+            func(data, "price", n_features=n_features, engine=engine)
+
+    funcs = dict(rfe=modeling.rfe_feature_ranking, sfs=modeling.seq_feature_selection)
+    times = dict()
+    for name, func in funcs.items():
+        times[f"{name}_sklearn"] = _time(rank_all, func, "sklearn")
+        selection.clear_cache()
+        times[f"{name}_native_cold"] = _time(rank_all, func, "native")
+        times[f"{name}_native_warm"] = _time(rank_all, func, "native")
+    return pd.Series(times, name="seconds")
+
+
+def cv_cost(path=SCRUBBED_PATH, n_vars=2, jobs=os.cpu_count()) -> pd.Series:
+    """Time `modeling.ols_sweep` with and without k-fold scores.
+
+    Also times k statsmodels refits per model, the naive way to get them.
+
+    Args:
+        path (str, optional): Pickled DataFrame to sweep. Defaults to SCRUBBED_PATH.
+        n_vars (int, optional): Number of predictors per model. Defaults to 2.
+        jobs (int, optional): Number of workers to create. Defaults to os.cpu_count().
+
+    Returns:
+        pd.Series: Seconds per sweep, indexed by method.
+    """
+    data = pd.read_pickle(path)
+    terms = modeling._sweep_terms(data, "price")
+    formulae = [f"price~{'+'.join(x)}" for x in itertools.combinations(terms, n_vars)]
+    labels = crossval.fold_labels(len(data))
+
+    def refit_folds():
+        for formula in formulae:
+            for fold in range(crossval.N_FOLDS):
+                train = data.loc[labels != fold]
+                ols(formula, train).fit().predict(data.loc[labels == fold])
+
+    def sweep(engine, tests):
+        with tempfile.TemporaryDirectory() as dst:
+            modeling.ols_sweep(
+                data, "price", n_vars, dst=dst, jobs=jobs, engine=engine, tests=tests
+            )
+
+    times = dict(refit_folds=_time(refit_folds))
+    for engine in ("formula", "gram"):
+        times[engine] = _time(sweep, engine, ())
+        times[f"{engine}_cv"] = _time(sweep, engine, ("cv",))
+    return pd.Series(times, name="seconds")
+
+
+def sparse_cost(path=SCRUBBED_PATH, n_rows=1_000_000) -> pd.DataFrame:
+    """Time and peak memory of dense and sparse designs with dummies.
+
+    Args:
+        path (str, optional): Pickled DataFrame. Defaults to SCRUBBED_PATH.
+        n_rows (int, optional): Rows to sample with replacement. Defaults to 1_000_000.
+
+    Returns:
+        pd.DataFrame: Seconds and peak MiB, indexed by (task, sparse).
+    """
+    data = pd.read_pickle(path).sample(n_rows, replace=True, random_state=0)
+    data = data.reset_index(drop=True)
+    terms = modeling._sweep_terms(data, "price")
+    tasks = dict(
+        gram_ols=partial(fastols.GramOLS, data, "price", terms),
+        design_corr=partial(fastols.design_corr, data, terms),
+        corrcache=lambda sparse: corrcache.CorrCache().matrix(
+            data, categorical=utils.cat_cols(data), sparse=sparse
+        ),
+        rfe_dummies=partial(
+            modeling.rfe_feature_ranking,
+            data,
+            "price",
+            dummify_cats=True,
+            engine="native",
+        ),
+    )
+    rows = dict()
+    for name, task in tasks.items():
+        for sparse in (False, True):
+            selection.clear_cache()
+            seconds = _time(task, sparse=sparse)
+            # Tracing slows allocations down, so trace a separate call.
+            selection.clear_cache()
+            tracemalloc.start()
+            task(sparse=sparse)
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+            rows[name, sparse] = dict(seconds=seconds, peak_mib=peak)
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis(["task", "sparse"])
+
+
+if __name__ == "__main__":
+    print(globals()[sys.argv[1]]())
@@ -4,10 +4,22 @@ import unidecode
 from string import punctuation
 import pandas as pd
 import numpy as np
+import sketches
 import utils
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
 RE_PUNCT = re.compile(f"[{re.escape(punctuation)}]")
 RE_WHITESPACE = re.compile(r"\s+")
+PUNCT_TABLE = str.maketrans("", "", punctuation)
 
 
 def nan_info(data: pd.DataFrame):
@@ -34,40 +46,223 @@ def who_is_nan(data: pd.DataFrame, col: str, name_col: str):
     return nan_rows(data)[data[col].isna()][name_col]
 
 
-def process_strings(strings: pd.Series) -> pd.Series:
-    df = strings.str.lower()
-    df = df.str.replace(RE_PUNCT, "").str.replace(RE_WHITESPACE, " ")
-    df = df.map(unidecode.unidecode, na_action="ignore")
-    return df
+def _process_string(string):
+    if not isinstance(string, str):
+        return np.nan
+    string = RE_WHITESPACE.sub(" ", string.lower().translate(PUNCT_TABLE))
+    return unidecode.unidecode(string)
+
+
+def process_strings(strings: pd.Series, dtype=None) -> pd.Series:
+    """Lowercase, strip punctuation, collapse whitespace, and transliterate to ASCII.
+
+    Each distinct string is processed once and the results are mapped back
+    through factorized codes, so the cost scales with the number of uniques.
+
+    Args:
+        strings (pd.Series): Strings to process. Other values become NaN.
+        dtype (str, optional): Result dtype, e.g. "category" or
+            "string[pyarrow]". Defaults to object.
+
+    Returns:
+        pd.Series: Processed strings.
+    """
+    codes, uniques = pd.factorize(strings)
+    processed = [_process_string(x) for x in uniques]
+    # Distinct inputs can collapse to the same output, so factorize again.
+    out_codes, categories = pd.factorize(np.array(processed, dtype=object))
+    # Without any strings every code is already -1, with nothing to take from.
+    if out_codes.size:
+        codes = np.where(codes >= 0, out_codes.take(codes, mode="clip"), -1)
+    values = pd.Categorical.from_codes(codes, categories=categories)
+    processed = pd.Series(values, index=strings.index, name=strings.name)
+    if dtype == "category":
+        return processed
+    return processed.astype(object if dtype is None else dtype)
 
 
 def detect_json_list(x):
     return isinstance(x, str) and bool(re.fullmatch(r"\[.*\]", x))
 
 
-def coerce_list_likes(data):
+def _json_loads(string: str):
+    if orjson is not None:
+        try:
+            return orjson.loads(string)
+        except ValueError:
+            # E.g. NaN literals or huge ints, which only `json` accepts.
+            pass
+    return json.loads(string)
+
+
+def _coerce_list_like(x) -> list:
+    # Equivalent to `detect_json_list` without the regex.
+    if isinstance(x, str) and len(x) > 1 and x[0] == "[" and x[-1] == "]":
+        if "\n" not in x:
+            x = _json_loads(x)
+    return list(x) if pd.api.types.is_list_like(x) else [x]
+
+
+def _factorize_objects(data: pd.Series) -> tuple:
+    """Like `pd.factorize`, but every unhashable element is its own unique."""
+    try:
+        return pd.factorize(data)
+    except TypeError:
+        notna = data.notna().to_numpy()
+        codes = np.full(data.size, -1)
+        codes[notna] = np.arange(notna.sum())
+        return codes, data.to_numpy()[notna]
+
+
+def coerce_list_likes(data, output="list"):
+    """Coerce every non-null element of `data` to a list.
+
+    JSON list strings are parsed (with `orjson` if installed), other
+    list-likes are converted, and scalars are wrapped. Each distinct value is
+    coerced once and the results are mapped back through factorized codes.
+
+    Args:
+        data (pd.Series): Series of list-likes, JSON list strings, and scalars.
+        output (str, optional): "list" for an object Series of lists, "arrow"
+            for a pyarrow list-typed Series (elements must share a type), or
+            "long" for the exploded values, like `Series.explode`. Defaults to "list".
+
+    Returns:
+        pd.Series: Coerced `data` in the requested form.
+    """
     if not isinstance(data, pd.Series):
         raise TypeError("`data` must be pd.Series")
-    json_strs = data.map(detect_json_list, na_action="ignore")
-    clean = data.copy()
-    clean[json_strs] = clean.loc[json_strs].map(json.loads)
-    list_like = clean.map(pd.api.types.is_list_like)
-    clean[~list_like] = clean.loc[~list_like].map(lambda x: [x], na_action="ignore")
-    clean = clean.map(list, na_action="ignore")
-    return clean
+    if output not in {"list", "arrow", "long"}:
+        raise ValueError(f"`output` must be 'list', 'arrow', or 'long', got '{output}'")
+    codes, uniques = _factorize_objects(data)
+    lists = [_coerce_list_like(x) for x in uniques]
+    if output == "list":
+        # Copy per row, so that equal elements do not share one mutable list.
+        coerced = [list(lists[x]) if x >= 0 else np.nan for x in codes.tolist()]
+        return pd.Series(coerced, index=data.index, name=data.name, dtype=object)
+    lengths = np.array([len(x) for x in lists], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    flat = np.empty(offsets[-1], dtype=object)
+    flat[:] = [y for x in lists for y in x]
+    if output == "arrow":
+        if pa is None:
+            raise ImportError("Arrow output requires `pyarrow`")
+        values = pa.array(flat, from_pandas=True)
+        unique_lists = pa.ListArray.from_arrays(pa.array(offsets), values)
+        taken = unique_lists.take(pa.array(codes, mask=codes < 0))
+        taken = pd.arrays.ArrowExtensionArray(taken)
+        return pd.Series(taken, index=data.index, name=data.name)
+    # Nulls and empty lists explode to one NaN row, like `Series.explode`.
+    row_lengths = np.where(codes >= 0, lengths[codes], 0)
+    out_lengths = np.maximum(row_lengths, 1)
+    rows = np.repeat(np.arange(codes.size), out_lengths)
+    position = np.arange(rows.size) - np.repeat(
+        np.cumsum(out_lengths) - out_lengths, out_lengths
+    )
+    has_value = row_lengths[rows] > 0
+    exploded = np.full(rows.size, np.nan, dtype=object)
+    exploded[has_value] = flat[offsets[codes[rows[has_value]]] + position[has_value]]
+    return pd.Series(exploded, index=data.index[rows], name=data.name)
+
+
+class Profiler:
+    """Null, duplicate, and distinct counts per column, built chunk by chunk.
+
+    Each column is factorized once per chunk, which yields all three counts.
+    Exact profiles keep every distinct value seen; approximate profiles keep
+    a HyperLogLog sketch per column instead, so memory stays constant.
+    Profiles of separate chunks or dumps can be merged.
+
+    Args:
+        approx (bool, optional): Count distinct values approximately. Defaults to False.
+        precision (int, optional): HyperLogLog precision. Defaults to 14.
+    """
+
+    def __init__(self, approx: bool = False, precision: int = 14):
+        self.approx = approx
+        self.precision = precision
+        self.n_rows = dict()
+        self.n_nan = dict()
+        self.distinct = dict()
+
+    def update(self, data: pd.DataFrame):
+        """Add a chunk of rows."""
+        for name, column in data.items():
+            codes, uniques = pd.factorize(column)
+            self.n_rows[name] = self.n_rows.get(name, 0) + codes.size
+            self.n_nan[name] = self.n_nan.get(name, 0) + np.count_nonzero(codes < 0)
+            self._add_distinct(name, uniques)
+        return self
+
+    def merge(self, other: "Profiler"):
+        """Add the counts of another profile of the same kind."""
+        if other.approx != self.approx:
+            raise ValueError("Cannot merge exact and approximate profiles")
+        for name in other.n_rows:
+            self.n_rows[name] = self.n_rows.get(name, 0) + other.n_rows[name]
+            self.n_nan[name] = self.n_nan.get(name, 0) + other.n_nan[name]
+            if self.approx and name in self.distinct:
+                self.distinct[name].merge(other.distinct[name])
+            else:
+                self._add_distinct(name, other.distinct[name])
+        return self
+
+    def _add_distinct(self, name, uniques):
+        if self.approx:
+            if name not in self.distinct:
+                self.distinct[name] = sketches.HyperLogLog(self.precision)
+            if isinstance(uniques, sketches.HyperLogLog):
+                self.distinct[name].merge(uniques)
+            else:
+                self.distinct[name].update(uniques)
+        elif name in self.distinct:
+            self.distinct[name] = self.distinct[name].append(pd.Index(uniques)).unique()
+        else:
+            self.distinct[name] = pd.Index(uniques)
+
+    def result(self, round_pct: int = 2) -> pd.DataFrame:
+        """Returns the profile in the format of `info`."""
+        names = list(self.n_rows)
+        n_rows = pd.Series(self.n_rows)[names]
+        nan = pd.Series(self.n_nan)[names]
+        if self.approx:
+            uniq = pd.Series({x: self.distinct[x].count() for x in names})
+            uniq = uniq.round().astype(np.int64).clip(upper=n_rows - nan)
+        else:
+            uniq = pd.Series({x: self.distinct[x].size for x in names})
+        # All but the first of each distinct value, including NaN, is a duplicate.
+        dup = n_rows - uniq - (nan > 0)
+        info = pd.concat([nan, dup, uniq], axis=1, keys=["nan", "dup", "uniq"])
+        pcts = info.div(n_rows, axis=0) * 100
+        pcts.columns = pcts.columns.map(lambda x: f"{x}_%")
+        pcts = pcts.round(round_pct)
+        info = pd.concat([info, pcts], axis=1)
+        return info.sort_index(axis=1).sort_values("nan", ascending=False)
+
+
+def profile(data, approx=False, precision=14, round_pct=2) -> pd.DataFrame:
+    """Profile a DataFrame, or an iterable of DataFrame chunks, like `info`.
+
+    Args:
+        data (pd.DataFrame or iterable): Data, or chunks of it, e.g. from
+            `pd.read_csv(..., chunksize=...)`.
+        approx (bool, optional): Count distinct values with HyperLogLog.
+            Defaults to False.
+        precision (int, optional): HyperLogLog precision. Defaults to 14.
+        round_pct (int, optional): Decimals of the percentages. Defaults to 2.
+
+    Returns:
+        pd.DataFrame: Counts and percentages of nulls, duplicates, and uniques.
+    """
+    profiler = Profiler(approx=approx, precision=precision)
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler.result(round_pct=round_pct)
 
 
 def info(data: pd.DataFrame, round_pct: int = 2) -> pd.DataFrame:
-    n_rows = data.shape[0]
-    nan = data.isna().sum().to_frame("nan")
-    dup = data.apply(lambda x: x.duplicated()).sum().to_frame("dup")
-    uniq = data.nunique().to_frame("uniq")
-    info = pd.concat([nan, dup, uniq], axis=1)
-    pcts = (info / n_rows) * 100
-    pcts.columns = pcts.columns.map(lambda x: f"{x}_%")
-    pcts = pcts.round(round_pct)
-    info = pd.concat([info, pcts], axis=1)
-    return info.sort_index(axis=1).sort_values("nan", ascending=False)
+    return profile(data, round_pct=round_pct)
 
 
 def show_uniques(data: pd.DataFrame, include: list = None, cut: int = None):
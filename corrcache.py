@@ -0,0 +1,233 @@
+"""Shared cache of Pearson correlation matrices.
+
+The correlation matrix of the requested columns of a DataFrame, including
+treatment dummies of the requested categorical columns, is computed once with
+a single matrix multiply on standardized data. Callers then take sub-matrices by label, so heatmaps and
+multicollinearity checks on the same data never recompute correlations.
+Dummy columns are labeled the way Patsy labels them, e.g. "C(zipcode)[T.98002]",
+so a model's exog names can be looked up directly.
+"""
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+import fastols
+import utils
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+RE_DUMMY = re.compile(r"C\((.+?)\)\[T\..*\]")
+
+
+def dummy_name(column: str, level) -> str:
+    """Returns the Patsy-style name of the dummy for `level` of `column`."""
+    return f"C({column})[T.{level}]"
+
+
+def pearson(x: np.ndarray) -> np.ndarray:
+    """Pearson correlations between the columns of `x`.
+
+    Missing values are dropped pairwise, like `pd.DataFrame.corr`. Without
+    missing values this is one matrix multiply.
+
+    Args:
+        x (np.ndarray): (n_rows, n_cols) array of floats.
+
+    Returns:
+        np.ndarray: (n_cols, n_cols) correlation matrix.
+    """
+    missing = np.isnan(x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = x - np.nanmean(x, axis=0)
+        if not missing.any():
+            norms = np.sqrt(np.einsum("ij,ij->j", x, x))
+            return (x.T @ x) / np.outer(norms, norms)
+        # Pairwise complete sums, each from one matrix multiply.
+        present = (~missing).astype(np.float64)
+        x = np.where(missing, 0.0, x)
+        n = present.T @ present
+        sum_x = x.T @ present
+        sum_xx = (x * x).T @ present
+        cov = x.T @ x - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x ** 2 / n
+        corr = cov / np.sqrt(var_x * var_x.T)
+    return np.where(n > 1, corr, np.nan)
+
+
+def sparse_pearson(x) -> np.ndarray:
+    """Like `pearson`, but for a sparse matrix, which is never densified.
+
+    Falls back to `pearson` on a dense copy if values are missing.
+
+    Args:
+        x (scipy.sparse matrix): (n_rows, n_cols) matrix of floats.
+
+    Returns:
+        np.ndarray: (n_cols, n_cols) correlation matrix.
+    """
+    if np.isnan(x.data).any():
+        return pearson(x.toarray())
+    _, gram = fastols.centered_gram(x)
+    norms = np.sqrt(np.diag(gram))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return gram / np.outer(norms, norms)
+
+
+def _design(data: pd.DataFrame, categorical: frozenset, sparse=False) -> tuple:
+    """Returns the labels and float matrix of numeric columns and dummies.
+
+    Numeric columns in `categorical` appear both as they are and as dummies.
+    With `sparse`, the matrix is CSC and dummy blocks are never densified.
+    """
+    names, blocks = [], []
+    for column in data.columns:
+        values = data[column]
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            names.append(column)
+            blocks.append(values.to_numpy(np.float64)[:, None])
+        if column in categorical:
+            levels = fastols._levels(values)
+            codes = pd.Categorical(values, categories=levels).codes
+            has_level = codes >= 0
+            rows = np.flatnonzero(has_level)
+            if sparse:
+                entries = (np.ones(rows.size), (rows, codes[has_level]))
+                block = sp.csc_matrix(entries, shape=(values.size, levels.size))
+            else:
+                block = np.zeros((values.size, levels.size))
+                block[rows, codes[has_level]] = 1.0
+            names += [dummy_name(column, x) for x in levels]
+            blocks.append(block)
+    if sparse:
+        blocks = [sp.csc_matrix(x) for x in blocks]
+        return names, sp.hstack(blocks, format="csc")
+    return names, np.hstack(blocks)
+
+
+class CorrCache:
+    """LRU cache of full correlation matrices, keyed on a DataFrame fingerprint.
+
+    Args:
+        max_bytes (int, optional): Memory cap for cached matrices. Least
+            recently used matrices are evicted beyond it. Defaults to 256 MiB.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def matrix(
+        self, data: pd.DataFrame, categorical=None, sparse=False
+    ) -> pd.DataFrame:
+        """Returns the correlation matrix of `data`.
+
+        Numeric and boolean columns are included as they are, and only the
+        columns in `categorical` are dummy coded. Other columns are left out.
+        Entries are keyed on a fingerprint of `data`, so pass only the
+        columns needed (see `get`).
+
+        Args:
+            data (pd.DataFrame): Data to correlate.
+            categorical (list, optional): Columns to dummy code. Defaults to None.
+            sparse (bool, optional): Build the dummies as a sparse matrix, so
+                the cost scales with the rows rather than rows times levels.
+                Defaults to False.
+
+        Returns:
+            pd.DataFrame: Correlations of numeric columns and dummies of all levels.
+        """
+        categorical = frozenset(categorical or ())
+        key = utils.fingerprint(data)
+        cached = self._entries.get(key)
+        if cached is not None and categorical <= cached[0]:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return cached[1]
+        self.misses += 1
+        if cached is not None:
+            # Recompute with the union, so alternating requests share one entry.
+            categorical |= cached[0]
+            self._evict(key)
+        names, x = _design(data, categorical, sparse=sparse)
+        corr = sparse_pearson(x) if sparse else pearson(x)
+        corr = pd.DataFrame(corr, index=names, columns=names)
+        if corr.values.nbytes <= self.max_bytes:
+            self._entries[key] = (categorical, corr)
+            self.nbytes += corr.values.nbytes
+            while self.nbytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+        return corr
+
+    def get(
+        self,
+        data: pd.DataFrame,
+        index=None,
+        columns=None,
+        categorical=None,
+        sparse=False,
+    ) -> pd.DataFrame:
+        """Returns the correlations of `index` with `columns`.
+
+        Only the columns of `data` which the labels refer to are correlated,
+        and a dummy label such as "C(zipcode)[T.98002]" dummy codes its column.
+
+        Args:
+            data (pd.DataFrame): Data to correlate.
+            index (list, optional): Row labels. Defaults to numeric columns.
+            columns (list, optional): Column labels. Defaults to `index`.
+            categorical (list, optional): Columns to dummy code as well.
+                Defaults to None.
+            sparse (bool, optional): Build the dummies as a sparse matrix.
+                Defaults to False.
+
+        Raises:
+            KeyError: A label is neither a column nor a dummy of `data`.
+
+        Returns:
+            pd.DataFrame: Correlations of `index` with `columns`.
+        """
+        if index is None:
+            index = data.select_dtypes(include=["number", "bool"]).columns
+        if columns is None:
+            columns = index
+        categorical = set(categorical or ())
+        needed = set(categorical)
+        for label in pd.Index(index).union(columns):
+            match = RE_DUMMY.fullmatch(str(label))
+            if label in data.columns or match is None:
+                needed.add(label)
+            else:
+                categorical.add(match.group(1))
+                needed.add(match.group(1))
+        frame = data.loc[:, data.columns.isin(needed)]
+        full = self.matrix(frame, categorical=categorical, sparse=sparse)
+        missing = pd.Index(index).union(columns).difference(full.index)
+        if missing.size:
+            raise KeyError(f"Not in correlation matrix: {missing.to_list()}")
+        return full.loc[index, columns]
+
+    def _evict(self, key):
+        _, corr = self._entries.pop(key)
+        self.nbytes -= corr.values.nbytes
+
+
+CACHE = CorrCache()
+
+
+def get(data: pd.DataFrame, index=None, columns=None, categorical=None, sparse=False):
+    """Like `CorrCache.get`, using the shared module cache."""
+    return CACHE.get(
+        data, index=index, columns=columns, categorical=categorical, sparse=sparse
+    )
@@ -0,0 +1,107 @@
+"""K-fold out-of-sample scores of OLS models from per-fold Gram matrices.
+
+The Gram matrix X'X of each test fold is computed once for the whole design.
+A training fold's Gram matrix is then the full one minus that fold's block.
+Each model in a sweep is solved from sub-blocks of those matrices, and the
+test error follows from the test fold's Gram matrix as
+y'y - 2b'X'y + b'X'Xb, so no model is ever refit on rows or predicted row by
+row. Folds are a seeded shuffle of the rows, the same for every model fit on
+the same rows, so scores are comparable across a sweep.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+import lstsq
+
+N_FOLDS = 5
+SEED = 0
+CV_FIELDS = ["cv_rmse", "cv_rsquared"]
+
+
+def fold_labels(n_obs: int, n_folds: int = N_FOLDS, seed: int = SEED) -> np.ndarray:
+    """Returns the fold of each row, from a seeded shuffle into equal folds."""
+    if not 2 <= n_folds <= n_obs:
+        raise ValueError(f"`n_folds` must be between 2 and {n_obs}, got {n_folds}")
+    return np.random.default_rng(seed).permutation(n_obs) % n_folds
+
+
+class FoldGrams:
+    """Per-fold cross-products of one design, for scoring many models.
+
+    Args:
+        x (np.ndarray or scipy.sparse matrix): (n_obs, n_cols) design shared
+            by every model, including the intercept column. Sparse designs
+            stay sparse.
+        y (np.ndarray): (n_obs,) endogenous variable.
+        n_folds (int, optional): Number of folds. Defaults to N_FOLDS.
+        seed (int, optional): Seed of the row shuffle. Defaults to SEED.
+    """
+
+    def __init__(self, x, y: np.ndarray, n_folds=N_FOLDS, seed=SEED):
+        if sp.issparse(x):
+            x = sp.csr_matrix(x, dtype=np.float64)
+        else:
+            x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        labels = fold_labels(y.size, n_folds, seed)
+        # Centering y leaves every error unchanged and avoids cancellation.
+        y = y - y.mean()
+        self.gram = np.empty((n_folds, x.shape[1], x.shape[1]))
+        self.xy = np.empty((n_folds, x.shape[1]))
+        self.yy = np.empty(n_folds)
+        self.sst = np.empty(n_folds)
+        self.n_test = np.bincount(labels, minlength=n_folds)
+        for fold in range(n_folds):
+            rows = labels == fold
+            x_test, y_test = x[rows], y[rows]
+            gram = x_test.T @ x_test
+            self.gram[fold] = gram.toarray() if sp.issparse(gram) else gram
+            self.xy[fold] = x_test.T @ y_test
+            self.yy[fold] = y_test @ y_test
+            self.sst[fold] = ((y_test - y_test.mean()) ** 2).sum()
+        self.full_gram = self.gram.sum(axis=0)
+        self.full_xy = self.xy.sum(axis=0)
+
+    def scores(self, cols: np.ndarray) -> dict:
+        """Cross-validate a batch of models which all have the same number of columns.
+
+        Args:
+            cols (np.ndarray): (n_models, n_cols) indices into the design.
+
+        Returns:
+            dict: Mean test-fold RMSE and R-squared, keyed by the names in CV_FIELDS.
+        """
+        cols = np.atleast_2d(cols)
+        left, right = cols[:, :, None], cols[:, None, :]
+        full_gram = self.full_gram[left, right]
+        full_xy = self.full_xy[cols]
+        sse = np.empty((self.n_test.size, cols.shape[0]))
+        for fold in range(self.n_test.size):
+            test_gram = self.gram[fold][left, right]
+            test_xy = self.xy[fold][cols]
+            coef, _ = lstsq.solve(full_gram - test_gram, full_xy - test_xy)
+            sse[fold] = (
+                self.yy[fold]
+                - 2 * np.einsum("mi,mi->m", coef, test_xy)
+                + np.einsum("mi,mij,mj->m", coef, test_gram, coef)
+            )
+        rmse = np.sqrt(sse / self.n_test[:, None]).mean(axis=0)
+        rsquared = (1 - sse / self.sst[:, None]).mean(axis=0)
+        return dict(zip(CV_FIELDS, [rmse, rsquared]))
+
+
+def cross_validate(x: np.ndarray, y: np.ndarray, n_folds=N_FOLDS, seed=SEED) -> dict:
+    """Cross-validate one OLS model, e.g. `model.model.exog` and `model.model.endog`.
+
+    Args:
+        x (np.ndarray): (n_obs, n_cols) design, including the intercept column.
+        y (np.ndarray): (n_obs,) endogenous variable.
+        n_folds (int, optional): Number of folds. Defaults to N_FOLDS.
+        seed (int, optional): Seed of the row shuffle. Defaults to SEED.
+
+    Returns:
+        dict: Mean test-fold RMSE and R-squared, keyed by the names in CV_FIELDS.
+    """
+    folds = FoldGrams(x, y, n_folds, seed)
+    scores = folds.scores(np.arange(np.shape(x)[1]))
+    return {k: v[0] for k, v in scores.items()}
@@ -0,0 +1,338 @@
+"""Heteroscedasticity and normality tests for many OLS models at once.
+
+Every model in a sweep draws its columns from one shared design matrix, so
+the auxiliary regressions of the Breusch-Pagan and White tests are solved
+from sub-blocks of one Gram matrix of the design columns and their pairwise
+products, with a single matrix multiply against all the squared residuals
+of a batch. Jarque-Bera moments are column sums over the batch of residuals,
+and Goldfeld-Quandt batteries sort every column at once. Results match
+`statsmodels.stats.api` up to rounding.
+"""
+import numpy as np
+import scipy.sparse as sp
+from scipy import stats
+
+import lstsq
+
+TESTS = ("bp", "white", "jb", "gq")
+# Names of the statistics of each test, as prefixed in sweep results.
+TEST_FIELDS = {
+    "bp": ["bp_lm", "bp_lm_pval", "bp_f_val", "bp_f_pval"],
+    "white": ["white_lm", "white_lm_pval", "white_f_val", "white_f_pval"],
+    "jb": ["jb", "jbpv", "skew", "kurtosis"],
+    "gq": ["gq_pass_ratio", "gq_max_f"],
+}
+BATCH_BYTES = 64 * 2 ** 20
+
+
+def _lstsq_ssr(gram: np.ndarray, xy: np.ndarray, yy: np.ndarray) -> tuple:
+    """Residual sums of squares and ranks of a batch of least squares problems.
+
+    Solved with `lstsq.solve`, so directions with tiny eigenvalues are
+    dropped and not counted in the rank, like `fastols.GramOLS`.
+
+    Args:
+        gram (np.ndarray): (n_problems, n_cols, n_cols) Gram matrices X'X.
+        xy (np.ndarray): (n_problems, n_cols) cross-products X'y.
+        yy (np.ndarray): (n_problems,) sums of squares y'y.
+
+    Returns:
+        tuple: (ssr, rank) arrays of shape (n_problems,).
+    """
+    coef, rank = lstsq.solve(gram, xy)
+    return yy - np.einsum("bj,bj->b", xy, coef), rank
+
+
+def _product_chunks(pairs: np.ndarray, max_products: int):
+    """Yields slices of models whose distinct column products fit in `max_products`."""
+    start, seen = 0, set()
+    for i, model_pairs in enumerate(pairs.tolist()):
+        model_pairs = set(map(tuple, model_pairs))
+        if i > start and len(seen | model_pairs) > max_products:
+            yield slice(start, i)
+            start, seen = i, set()
+        seen |= model_pairs
+    if start < len(pairs):
+        yield slice(start, len(pairs))
+
+
+def _aux_fit(x, pairs, y, batch_bytes=BATCH_BYTES) -> tuple:
+    """Regress each column of `y` on products of pairs of columns of `x`.
+
+    Args:
+        x (np.ndarray): (n_obs, n_cols) shared design.
+        pairs (np.ndarray): (n_models, n_aux, 2) column pairs whose products
+            are the regressors of each model.
+        y (np.ndarray): (n_obs, n_models) responses.
+        batch_bytes (int, optional): Memory for the distinct products of a
+            chunk of models. Defaults to BATCH_BYTES.
+
+    Returns:
+        tuple: Centered R-squared, F statistics and model and residual df.
+    """
+    pairs = np.sort(pairs, axis=2)
+    nobs, n_models = y.shape
+    ssr, rank = np.empty(n_models), np.empty(n_models, dtype=np.int64)
+    max_products = max(1, batch_bytes // (nobs * x.itemsize))
+    for chunk in _product_chunks(pairs, max_products):
+        flat = pairs[chunk].reshape(-1, 2)
+        uniq, inverse = np.unique(flat, axis=0, return_inverse=True)
+        inverse = inverse.reshape(pairs[chunk].shape[:2])
+        # One Gram matrix of the distinct products serves every model.
+        products = x[:, uniq[:, 0]] * x[:, uniq[:, 1]]
+        gram = products.T @ products
+        xy = (products.T @ y[:, chunk]).T
+        ssr[chunk], rank[chunk] = _lstsq_ssr(
+            gram[inverse[:, :, None], inverse[:, None, :]],
+            np.take_along_axis(xy, inverse, axis=1),
+            np.einsum("ij,ij->j", y[:, chunk], y[:, chunk]),
+        )
+    yc = y - y.mean(axis=0)
+    tss = np.einsum("ij,ij->j", yc, yc)
+    df_model, df_resid = rank - 1, nobs - rank
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fval = ((tss - ssr) / df_model) / (ssr / df_resid)
+    return 1 - ssr / tss, fval, df_model, df_resid
+
+
+def breusch_pagan(x: np.ndarray, cols: np.ndarray, resid: np.ndarray) -> tuple:
+    """Studentized Breusch-Pagan tests of a batch of models.
+
+    Args:
+        x (np.ndarray): (n_obs, n_cols) shared design, with the intercept as
+            its first column.
+        cols (np.ndarray): (n_models, n_exog) design columns of each model,
+            including the intercept.
+        resid (np.ndarray): (n_obs, n_models) residuals.
+
+    Returns:
+        tuple: Arrays of LM statistics, LM p-values, F statistics, and F p-values.
+    """
+    pairs = np.stack([np.zeros_like(cols), cols], axis=2)
+    rsquared, fval, df_model, df_resid = _aux_fit(x, pairs, resid ** 2)
+    lm = resid.shape[0] * rsquared
+    # statsmodels takes the LM df from the number of exog, not the rank.
+    lm_pval = stats.chi2.sf(lm, cols.shape[1] - 1)
+    return lm, lm_pval, fval, stats.f.sf(fval, df_model, df_resid)
+
+
+def white(x: np.ndarray, cols: np.ndarray, resid: np.ndarray) -> tuple:
+    """White's tests of a batch of models, like `breusch_pagan`.
+
+    The auxiliary regressors are the products of every pair of exog,
+    including squares and the intercept, with duplicates absorbed by the rank.
+    """
+    i0, i1 = np.triu_indices(cols.shape[1])
+    pairs = np.stack([cols[:, i0], cols[:, i1]], axis=2)
+    rsquared, fval, df_model, df_resid = _aux_fit(x, pairs, resid ** 2)
+    lm = resid.shape[0] * rsquared
+    lm_pval = stats.chi2.sf(lm, df_model)
+    return lm, lm_pval, fval, stats.f.sf(fval, df_model, df_resid)
+
+
+def jarque_bera(resid: np.ndarray) -> tuple:
+    """Jarque-Bera tests of each column of (n_obs, n_models) `resid`.
+
+    Returns:
+        tuple: Arrays of JB statistics, p-values, skews, and kurtoses.
+    """
+    nobs = resid.shape[0]
+    resid = resid - resid.mean(axis=0)
+    sq_resid = resid ** 2
+    m2 = sq_resid.sum(axis=0) / nobs
+    m3 = np.einsum("ij,ij->j", sq_resid, resid) / nobs
+    m4 = np.einsum("ij,ij->j", sq_resid, sq_resid) / nobs
+    skew = m3 / m2 ** 1.5
+    kurtosis = m4 / m2 ** 2
+    jb = nobs / 6 * (skew ** 2 + (kurtosis - 3) ** 2 / 4)
+    return jb, stats.chi2.sf(jb, 2), skew, kurtosis
+
+
+def _gq_bounds(nobs: int, split: float, drop: float) -> tuple:
+    """Returns the end of the first subsample and start of the second, like statsmodels."""
+    if split is None:
+        split = nobs // 2
+    elif 0 < split < 1:
+        split = int(nobs * split)
+    if drop is None:
+        return split, split
+    if 0 < drop < 1:
+        return split, split + int(nobs * drop)
+    return split, split + drop
+
+
+def _subsample_ssr(x: np.ndarray, y: np.ndarray) -> tuple:
+    """Returns `_lstsq_ssr` of (n_problems, n_rows, n_cols) `x` and (n_problems, n_rows) `y`."""
+    gram = np.matmul(x.transpose(0, 2, 1), x)
+    xy = np.einsum("bij,bi->bj", x, y)
+    return _lstsq_ssr(gram, xy, np.einsum("bi,bi->b", y, y))
+
+
+def goldfeld_quandt(
+    resid: np.ndarray,
+    exog: np.ndarray,
+    split: float = 0.45,
+    drop: float = 0.1,
+    batch_bytes: int = BATCH_BYTES,
+) -> tuple:
+    """Two-sided Goldfeld-Quandt tests of `resid`, sorting by each column of `exog`.
+
+    Matches `statsmodels.stats.api.het_goldfeldquandt` with `idx` set to each
+    column in turn, but argsorts every column at once and solves the
+    subsample regressions of many columns as one batch.
+
+    Args:
+        resid (np.ndarray): (n_obs,) residuals.
+        exog (np.ndarray): (n_obs, n_cols) regressors.
+        split (float, optional): Fraction of observations for split point. Defaults to 0.45.
+        drop (float, optional): Fraction of observations to drop. Defaults to 0.1.
+        batch_bytes (int, optional): Memory for sorted copies of `exog` per batch.
+            Defaults to BATCH_BYTES.
+
+    Returns:
+        tuple: Arrays of F statistics and p-values, one per column of `exog`.
+    """
+    resid = np.asarray(resid, dtype=np.float64)
+    exog = np.asarray(exog, dtype=np.float64)
+    nobs, n_cols = exog.shape
+    split, start2 = _gq_bounds(nobs, split, drop)
+    order = np.argsort(exog, axis=0)
+    batch = max(1, batch_bytes // (nobs * (n_cols + 1) * exog.itemsize))
+    fvals, pvals = np.empty(n_cols), np.empty(n_cols)
+    for start in range(0, n_cols, batch):
+        rows = order[:, start : start + batch].T
+        x, y = exog[rows], resid[rows]
+        ssr1, rank1 = _subsample_ssr(x[:, :split], y[:, :split])
+        ssr2, rank2 = _subsample_ssr(x[:, start2:], y[:, start2:])
+        df1, df2 = split - rank1, (nobs - start2) - rank2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fval = (ssr2 / df2) / (ssr1 / df1)
+        pval = 2 * np.minimum(stats.f.cdf(fval, df2, df1), stats.f.sf(fval, df2, df1))
+        fvals[start : start + batch] = fval
+        pvals[start : start + batch] = pval
+    return fvals, pvals
+
+
+def gq_pass_max(fvals: np.ndarray, pvals: np.ndarray, alpha=0.05) -> tuple:
+    """Returns the fraction of GQ tests passed and the largest failing F statistic."""
+    failed = pvals < alpha
+    max_f = fvals[failed].max() if failed.any() else np.nan
+    return (~failed).mean(), max_f
+
+
+class Diagnostics:
+    """Runs TESTS on batches of models drawn from one shared design.
+
+    Goldfeld-Quandt batteries sort by each design column, and every model
+    containing that column shares the same subsamples. Their sort orders and
+    Gram matrices are computed once per column and cached across batches, so
+    each model only adds sub-block lookups and small eigendecompositions.
+
+    Args:
+        x (np.ndarray or scipy.sparse matrix): (n_obs, n_cols) shared
+            design, with the intercept as its first column. Sparse designs
+            are only densified one batch's columns at a time.
+        split (float, optional): GQ fraction of observations for split point.
+            Defaults to 0.45.
+        drop (float, optional): GQ fraction of observations to drop. Defaults to 0.1.
+    """
+
+    def __init__(self, x, split: float = 0.45, drop: float = 0.1):
+        if sp.issparse(x):
+            self.x = sp.csc_matrix(x, dtype=np.float64)
+        else:
+            self.x = np.asarray(x, dtype=np.float64)
+        self.split, self.start2 = _gq_bounds(self.x.shape[0], split, drop)
+        self._subsamples = dict()
+
+    def _columns(self, cols: np.ndarray) -> tuple:
+        """Returns the dense design columns used by `cols`, and `cols` into them."""
+        if not sp.issparse(self.x):
+            return self.x, cols
+        used, inverse = np.unique(cols, return_inverse=True)
+        return self.x[:, used].toarray(), inverse.reshape(cols.shape)
+
+    def _subsample_grams(self, col: int) -> tuple:
+        """Returns the rows and Gram matrices of both GQ subsamples sorted by `col`."""
+        if col not in self._subsamples:
+            column = self.x[:, col]
+            if sp.issparse(column):
+                column = column.toarray().ravel()
+            order = np.argsort(column)
+            rows = order[: self.split], order[self.start2 :]
+            grams = [self.x[x].T @ self.x[x] for x in rows]
+            grams = [x.toarray() if sp.issparse(x) else x for x in grams]
+            self._subsamples[col] = rows, grams
+        return self._subsamples[col]
+
+    def goldfeld_quandt(self, cols: np.ndarray, resid: np.ndarray) -> tuple:
+        """GQ statistics of each model, sorting by each of its exog.
+
+        Args:
+            cols (np.ndarray): (n_models, n_exog) design columns of each model.
+            resid (np.ndarray): (n_obs, n_models) residuals.
+
+        Returns:
+            tuple: (n_models, n_exog) arrays of F statistics and p-values.
+        """
+        fvals, pvals = np.empty(cols.shape), np.empty(cols.shape)
+        for col in np.unique(cols):
+            models, position = np.nonzero(cols == col)
+            sub_cols = cols[models]
+            ssr, rank, nobs = [], [], []
+            for rows, gram in zip(*self._subsample_grams(col)):
+                sub_resid = resid[rows][:, models]
+                xy = (self.x[rows].T @ sub_resid).T
+                sub_ssr, sub_rank = _lstsq_ssr(
+                    gram[sub_cols[:, :, None], sub_cols[:, None, :]],
+                    np.take_along_axis(xy, sub_cols, axis=1),
+                    np.einsum("ij,ij->j", sub_resid, sub_resid),
+                )
+                ssr.append(sub_ssr)
+                rank.append(sub_rank)
+                nobs.append(rows.size)
+            df1, df2 = nobs[0] - rank[0], nobs[1] - rank[1]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                fval = (ssr[1] / df2) / (ssr[0] / df1)
+            pval = 2 * np.minimum(
+                stats.f.cdf(fval, df2, df1), stats.f.sf(fval, df2, df1)
+            )
+            fvals[models, position] = fval
+            pvals[models, position] = pval
+        return fvals, pvals
+
+    def run(self, cols: np.ndarray, resid: np.ndarray, tests=TESTS) -> dict:
+        """Run `tests` on a batch of models.
+
+        Args:
+            cols (np.ndarray): (n_models, n_exog) design columns of each model,
+                including the intercept, in the order of the model's exog.
+            resid (np.ndarray): (n_obs, n_models) residuals.
+            tests (tuple, optional): Any of TESTS. Defaults to TESTS.
+
+        Returns:
+            dict: Arrays of statistics, keyed by the names in TEST_FIELDS.
+        """
+        unknown = set(tests) - set(TESTS)
+        if unknown:
+            raise ValueError(f"Unknown tests: {sorted(unknown)}")
+        cols = np.atleast_2d(cols)
+        resid = np.asarray(resid, dtype=np.float64).reshape(self.x.shape[0], -1)
+        results = dict()
+        if "bp" in tests or "white" in tests:
+            x, x_cols = self._columns(cols)
+        if "bp" in tests:
+            results.update(zip(TEST_FIELDS["bp"], breusch_pagan(x, x_cols, resid)))
+        if "white" in tests:
+            results.update(zip(TEST_FIELDS["white"], white(x, x_cols, resid)))
+        if "jb" in tests:
+            results.update(zip(TEST_FIELDS["jb"], jarque_bera(resid)))
+        if "gq" in tests:
+            gq = [gq_pass_max(*x) for x in zip(*self.goldfeld_quandt(cols, resid))]
+            results.update(zip(TEST_FIELDS["gq"], np.array(gq, dtype=np.float64).T))
+        return results
+
+
+def diagnose(x: np.ndarray, cols: np.ndarray, resid: np.ndarray, tests=TESTS) -> dict:
+    """Like `Diagnostics.run`, for a single batch of models drawn from `x`."""
+    return Diagnostics(x).run(cols, resid, tests=tests)
@@ -0,0 +1,607 @@
+"""Batched OLS on column subsets of one shared design matrix.
+
+Every model in a sweep is a subset of the same design matrix, so the
+Gram matrices X'X and X'y only need to be computed once. Each model is then
+solved from sub-blocks of those matrices, in batches of equally sized models,
+and the fields of `modeling.summarize` are computed with vectorized NumPy.
+"""
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy import stats
+
+import crossval
+import diagnostics
+import lstsq
+
+RE_PATSY_CAT = re.compile(r"C\((\w+)\)")
+# Model selection criteria, mapped to whether larger values are better.
+CRITERIA = {"rsquared_adj": True, "aic": False, "bic": False}
+
+
+def _levels(column: pd.Series) -> pd.Index:
+    if pd.api.types.is_categorical_dtype(column):
+        return column.cat.categories
+    return pd.Index(np.sort(column.dropna().unique()))
+
+
+def _is_cat_term(data: pd.DataFrame, term: str) -> bool:
+    column = RE_PATSY_CAT.sub(r"\1", term)
+    return bool(RE_PATSY_CAT.fullmatch(term)) or not pd.api.types.is_numeric_dtype(
+        data[column]
+    )
+
+
+def _dummy_block(column: pd.Series, sparse=False) -> tuple:
+    """Returns treatment-coded dummies named the way Patsy names them.
+
+    With `sparse`, the block is a CSC matrix holding one entry per row
+    outside the reference level.
+    """
+    levels = _levels(column)
+    codes = pd.Categorical(column, categories=levels).codes
+    names = [f"C({column.name})[T.{x}]" for x in levels[1:]]
+    has_level = codes > 0
+    rows = np.flatnonzero(has_level)
+    if sparse:
+        entries = (np.ones(rows.size), (rows, codes[has_level] - 1))
+        return names, sp.csc_matrix(entries, shape=(column.size, levels.size - 1))
+    block = np.zeros((column.size, levels.size - 1))
+    block[rows, codes[has_level] - 1] = 1.0
+    return names, block
+
+
+def centered_gram(x) -> tuple:
+    """Returns the column means and centered cross-products of `x`.
+
+    Dense matrices are centered before multiplying. Sparse matrices are
+    never densified as a whole: mostly non-zero columns, e.g. numeric ones
+    next to dummies, are densified and centered, and the cross-products of
+    the others are X'X - n * outer(mean, mean).
+
+    Args:
+        x (np.ndarray or scipy.sparse matrix): (n_obs, n_cols) matrix.
+
+    Returns:
+        tuple: (n_cols,) means and (n_cols, n_cols) centered cross-products.
+    """
+    n_obs = x.shape[0]
+    if not sp.issparse(x):
+        mean = x.mean(axis=0)
+        centered = x - mean
+        return mean, centered.T @ centered
+    x = sp.csc_matrix(x)
+    mean = np.asarray(x.sum(axis=0)).ravel() / n_obs
+    is_dense = np.diff(x.indptr) > n_obs // 2
+    dense, sparse = np.flatnonzero(is_dense), np.flatnonzero(~is_dense)
+    centered = x[:, dense].toarray() - mean[dense]
+    x = x[:, sparse]
+    gram = np.empty((mean.size, mean.size))
+    gram[np.ix_(dense, dense)] = centered.T @ centered
+    # Centered columns sum to zero, so the other side needs no centering.
+    cross = x.T @ centered
+    gram[np.ix_(sparse, dense)] = cross
+    gram[np.ix_(dense, sparse)] = cross.T
+    sparse_gram = (x.T @ x).toarray() - n_obs * np.outer(mean[sparse], mean[sparse])
+    gram[np.ix_(sparse, sparse)] = sparse_gram
+    return mean, gram
+
+
+class _Standardized:
+    """Standardized view of a sparse design, which stays sparse.
+
+    Supports the products GramOLS takes with its standardized design:
+    `z @ coef` and `z.T @ v`.
+    """
+
+    def __init__(self, x, mean, std, transposed=False):
+        self.x = x
+        self.mean = mean
+        self.std = std
+        self.transposed = transposed
+        self.shape = x.shape[::-1] if transposed else x.shape
+
+    @property
+    def T(self):
+        return _Standardized(self.x, self.mean, self.std, not self.transposed)
+
+    def __matmul__(self, other):
+        if self.transposed:
+            cross = self.x.T @ other - np.multiply.outer(self.mean, other.sum(axis=0))
+            return (cross.T / self.std).T
+        scaled = (other.T / self.std).T
+        return self.x @ scaled - self.mean @ scaled
+
+
+def exog_names(data: pd.DataFrame, terms: list) -> list:
+    """Returns every design column name which `terms` can produce.
+
+    Args:
+        data (pd.DataFrame): Data containing the columns of `terms`.
+        terms (list): Numeric column names and/or "C(x)" categorical terms.
+
+    Returns:
+        list: Patsy-style names, starting with "Intercept".
+    """
+    names = ["Intercept"]
+    for term in terms:
+        column = RE_PATSY_CAT.sub(r"\1", term)
+        if _is_cat_term(data, term):
+            names += [f"C({column})[T.{x}]" for x in _levels(data[column])[1:]]
+        else:
+            names.append(column)
+    return names
+
+
+def _skew_z(skew: np.ndarray, n: int) -> np.ndarray:
+    """Z-score of D'Agostino's skewness test (see `scipy.stats.skewtest`)."""
+    y = skew * np.sqrt(((n + 1) * (n + 3)) / (6.0 * (n - 2)))
+    beta2 = (
+        3.0
+        * (n ** 2 + 27 * n - 70)
+        * (n + 1)
+        * (n + 3)
+        / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9))
+    )
+    w2 = -1 + np.sqrt(2 * (beta2 - 1))
+    delta = 1 / np.sqrt(0.5 * np.log(w2))
+    alpha = np.sqrt(2.0 / (w2 - 1))
+    y = np.where(y == 0, 1, y)
+    return delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+
+def _kurtosis_z(kurtosis: np.ndarray, n: int) -> np.ndarray:
+    """Z-score of the Anscombe-Glynn test (see `scipy.stats.kurtosistest`)."""
+    mean = 3.0 * (n - 1) / (n + 1)
+    var = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+    x = (kurtosis - mean) / np.sqrt(var)
+    sqrtbeta1 = (
+        6.0
+        * (n * n - 5 * n + 2)
+        / ((n + 7) * (n + 9))
+        * np.sqrt((6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3)))
+    )
+    a = 6.0 + 8.0 / sqrtbeta1 * (2.0 / sqrtbeta1 + np.sqrt(1 + 4.0 / sqrtbeta1 ** 2))
+    term1 = 1 - 2 / (9.0 * a)
+    denom = 1 + x * np.sqrt(2 / (a - 4.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        term2 = np.sign(denom) * np.where(
+            denom == 0.0, np.nan, ((1 - 2.0 / a) / np.abs(denom)) ** (1 / 3.0)
+        )
+    return (term1 - term2) / np.sqrt(2 / (9.0 * a))
+
+
+def _design(data: pd.DataFrame, terms: list, sparse=False) -> tuple:
+    """Returns the names, matrix, term columns and categorical flags of a design.
+
+    With `sparse`, the matrix is CSC and dummy blocks are never densified.
+    """
+    names, blocks, term_cols, is_cat = [], [], {}, {}
+    for term in terms:
+        column = RE_PATSY_CAT.sub(r"\1", term)
+        if _is_cat_term(data, term):
+            term_names, block = _dummy_block(data[column], sparse=sparse)
+            is_cat[term] = True
+        else:
+            term_names = [column]
+            block = data[column].to_numpy(np.float64)[:, None]
+            is_cat[term] = False
+        start = len(names)
+        term_cols[term] = np.arange(start, start + len(term_names))
+        names += term_names
+        blocks.append(block)
+    if sparse:
+        blocks = [sp.csc_matrix(x) for x in blocks]
+        return names, sp.hstack(blocks, format="csc"), term_cols, is_cat
+    return names, np.hstack(blocks), term_cols, is_cat
+
+
+def design_corr(data: pd.DataFrame, terms: list, sparse=False) -> pd.DataFrame:
+    """Pearson correlations between all design columns which `terms` produce.
+
+    Any model on a subset of `terms` (and the same rows) can look up its
+    exog correlations here instead of recomputing them.
+
+    Args:
+        data (pd.DataFrame): Data containing the columns of `terms`.
+        terms (list): Numeric column names and/or "C(x)" categorical terms.
+        sparse (bool, optional): Build dummies as a sparse matrix. Defaults to False.
+
+    Returns:
+        pd.DataFrame: Correlation matrix labeled with Patsy-style names.
+    """
+    columns = [RE_PATSY_CAT.sub(r"\1", x) for x in terms]
+    names, x, _, _ = _design(data.loc[:, columns].dropna(), terms, sparse=sparse)
+    _, gram = centered_gram(x)
+    norms = np.sqrt(np.diag(gram))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = gram / np.outer(norms, norms)
+    return pd.DataFrame(corr, index=names, columns=names)
+
+
+class GramOLS:
+    """Fits many OLS models from one precomputed Gram matrix.
+
+    Every model is fit on the same rows: those without missing values in
+    `target` or any of `terms` (listwise deletion). Statsmodels formulas
+    drop missing rows per model instead, so with missing data the results
+    differ from fitting each formula on its own. Coefficients and p-values of
+    rank-deficient models, e.g. with nested categoricals, also differ from
+    statsmodels', since the minimum-norm fit is taken on standardized terms.
+
+    Args:
+        data (pd.DataFrame): Data containing `target` and all terms.
+        target (str): Name of the endogenous variable.
+        terms (list): Numeric column names and/or "C(x)" categorical terms.
+        high_corr (float, optional): Threshold used for `high_corr_exog`.
+            Defaults to 0.7.
+        n_folds (int, optional): Folds of the "cv" test (see `crossval`).
+            Defaults to crossval.N_FOLDS.
+        sparse (bool, optional): Keep the design sparse, so memory and time
+            scale with the non-zeros of high-cardinality dummies rather than
+            rows times levels. The "white" test densifies only the columns
+            of each batch of models. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        target: str,
+        terms: list,
+        high_corr=0.7,
+        n_folds=None,
+        sparse=False,
+    ):
+        self.target = target
+        self.terms = list(terms)
+        self.high_corr = high_corr
+        columns = [RE_PATSY_CAT.sub(r"\1", x) for x in self.terms]
+        data = data.loc[:, [target] + columns].dropna()
+        names, x, self.term_cols, self.is_cat = _design(data, self.terms, sparse)
+        self.names = np.array(names, dtype=object)
+        self.index = data.index
+        self.y = data[target].to_numpy(np.float64)
+        self.nobs = self.y.size
+
+        # Center and scale the regressors: the intercept is solved separately,
+        # which keeps the Gram matrix well conditioned.
+        if sparse:
+            self.x_mean, centered = centered_gram(x)
+            x_std = np.sqrt(np.diag(centered) / self.nobs)
+            self.x_std = np.where(x_std > 0, x_std, 1.0)
+            self.z = _Standardized(x, self.x_mean, self.x_std)
+            self.gram = centered / np.outer(self.x_std, self.x_std)
+        else:
+            self.x_mean = x.mean(axis=0)
+            x_std = x.std(axis=0)
+            self.x_std = np.where(x_std > 0, x_std, 1.0)
+            self.z = (x - self.x_mean) / self.x_std
+            self.gram = self.z.T @ self.z
+        self.y_mean = self.y.mean()
+        self.yc = self.y - self.y_mean
+        self.zy = self.z.T @ self.yc
+        self.tss = self.yc @ self.yc
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.corr = self.gram / np.outer(np.sqrt(np.diag(self.gram)),
+                                             np.sqrt(np.diag(self.gram)))
+        self.high = self.corr >= high_corr
+        np.fill_diagonal(self.high, False)
+
+        # Raw design and cross-products (with intercept) for the condition
+        # number, the optional `diagnostics` and cross-validation.
+        ones = np.ones((self.nobs, 1))
+        if sparse:
+            self.raw = sp.hstack([ones, x], format="csc")
+            # Uncenter the cross-products rather than multiplying again.
+            sums = self.nobs * self.x_mean
+            self.raw_gram = np.block(
+                [
+                    [np.array([[self.nobs]]), sums[None, :]],
+                    [sums[:, None], centered + np.outer(sums, self.x_mean)],
+                ]
+            )
+        else:
+            self.raw = np.hstack([ones, x])
+            self.raw_gram = self.raw.T @ self.raw
+        self.n_folds = crossval.N_FOLDS if n_folds is None else n_folds
+        self._diagnostics = None
+        self._folds = None
+
+    @property
+    def diagnostics(self):
+        """Batched `diagnostics` of the raw design, built on first use."""
+        if self._diagnostics is None:
+            self._diagnostics = diagnostics.Diagnostics(self.raw)
+        return self._diagnostics
+
+    @property
+    def folds(self):
+        """Per-fold Gram matrices of the raw design, built on first use."""
+        if self._folds is None:
+            self._folds = crossval.FoldGrams(self.raw, self.y, self.n_folds)
+        return self._folds
+
+    def formula(self, combo) -> str:
+        return f"{self.target}~{'+'.join(combo)}"
+
+    def _columns(self, combo) -> np.ndarray:
+        """Design columns of `combo`, ordered categorical-first like Patsy."""
+        cats = [self.term_cols[x] for x in combo if self.is_cat[x]]
+        nums = [self.term_cols[x] for x in combo if not self.is_cat[x]]
+        return np.concatenate(cats + nums)
+
+    def _solve(self, cols: np.ndarray) -> tuple:
+        """Returns the inverse Gram sub-blocks, slopes and model df of a batch."""
+        gram = self.gram[cols[:, :, None], cols[:, None, :]]
+        # Pseudo-inverse of the standardized Gram matrix, so rank-deficient
+        # models still get a fit. Their minimum-norm coefficients, and so
+        # their p-values, differ from statsmodels'.
+        inv, rank = lstsq.pinv(gram)
+        beta = np.einsum("mij,mj->mi", inv, self.zy[cols])
+        return inv, beta, rank
+
+    def _score_group(self, cols: np.ndarray, criterion: str) -> np.ndarray:
+        """Score a batch of models from the Gram matrix alone, without residuals."""
+        n = self.nobs
+        _, beta, df_model = self._solve(cols)
+        ssr = self.tss - np.einsum("mi,mi->m", beta, self.zy[cols])
+        if criterion == "rsquared_adj":
+            return 1 - (n - 1) / (n - df_model - 1) * ssr / self.tss
+        llf = -n / 2 * (np.log(2 * np.pi) + np.log(ssr / n) + 1)
+        penalty = 2 if criterion == "aic" else np.log(n)
+        return -2 * llf + penalty * (df_model + 1)
+
+    def score(self, combos: list, criterion="rsquared_adj", batch_size=1024):
+        """Compute a model selection criterion for each combination of terms.
+
+        Args:
+            combos (list): Tuples of terms, one per model.
+            criterion (str, optional): "rsquared_adj", "aic", or "bic".
+                Defaults to "rsquared_adj".
+            batch_size (int, optional): Models solved per vectorized batch.
+                Defaults to 1024.
+
+        Returns:
+            np.ndarray: Scores in the order of `combos`.
+        """
+        if criterion not in CRITERIA:
+            raise ValueError(
+                f"`criterion` must be one of {tuple(CRITERIA)}, got '{criterion}'"
+            )
+        groups = defaultdict(list)
+        for i, combo in enumerate(combos):
+            cols = self._columns(combo)
+            groups[cols.size].append((i, cols))
+        scores = np.empty(len(combos))
+        for group in groups.values():
+            for start in range(0, len(group), batch_size):
+                idx, cols = zip(*group[start : start + batch_size])
+                scores[list(idx)] = self._score_group(np.vstack(cols), criterion)
+        return scores
+
+    def search(
+        self,
+        max_vars: int,
+        top_k=10,
+        beam_width=50,
+        criterion="rsquared_adj",
+        seeds=None,
+    ) -> dict:
+        """Beam search for the best combinations of terms of each size.
+
+        Each size extends the `beam_width` best combinations of the previous
+        size by one term, so only a small fraction of all subsets is scored.
+
+        Args:
+            max_vars (int): Largest number of terms per model.
+            top_k (int, optional): Combinations to return per size. Defaults to 10.
+            beam_width (int, optional): Combinations extended per size. Defaults to 50.
+            criterion (str, optional): "rsquared_adj", "aic", or "bic".
+                Defaults to "rsquared_adj".
+            seeds (list, optional): Rankings of terms (best first) whose
+                prefixes are always scored. Defaults to None.
+
+        Returns:
+            dict: Size -> list of (combo, score), best first.
+        """
+        position = {x: i for i, x in enumerate(self.terms)}
+        sign = 1 if CRITERIA[criterion] else -1
+        seeds = [[x for x in seed if x in position] for seed in seeds or []]
+        beam, best = [()], dict()
+        for size in range(1, max_vars + 1):
+            candidates = {
+                tuple(sorted(combo + (x,), key=position.get))
+                for combo in beam
+                for x in self.terms
+                if x not in combo
+            }
+            candidates.update(
+                tuple(sorted(seed[:size], key=position.get))
+                for seed in seeds
+                if len(seed) >= size
+            )
+            candidates = sorted(candidates, key=lambda x: [position[y] for y in x])
+            scores = self.score(candidates, criterion)
+            order = np.argsort(-sign * scores, kind="stable")
+            beam = [candidates[i] for i in order[:beam_width]]
+            best[size] = [(candidates[i], scores[i]) for i in order[:top_k]]
+        return best
+
+    def _fit_group(self, cols: np.ndarray) -> dict:
+        """Fit a batch of models which all have the same number of columns.
+
+        Args:
+            cols (np.ndarray): (n_models, n_cols) indices into the design.
+
+        Returns:
+            dict: Arrays of per-model statistics.
+        """
+        n_models = cols.shape[0]
+        n = self.nobs
+        inv, beta, df_model = self._solve(cols)
+        df_resid = n - df_model - 1
+
+        # Scatter coefficients into one matrix so every residual vector in
+        # the batch comes from a single matrix multiply.
+        coef = np.zeros((self.z.shape[1], n_models))
+        coef[cols.T, np.arange(n_models)] = beta.T
+        resid = self.yc[:, None] - self.z @ coef
+        ssr = np.einsum("ij,ij->j", resid, resid)
+        ess = self.tss - ssr
+        rsquared = 1 - ssr / self.tss
+        rsquared_adj = 1 - (n - 1) / df_resid * (1 - rsquared)
+        scale = ssr / df_resid
+        fval = (ess / df_model) / scale
+        f_pval = stats.f.sf(fval, df_model, df_resid)
+
+        # Unscale the slopes and recover the intercept.
+        x_std = self.x_std[cols]
+        mean_std = self.x_mean[cols] / x_std
+        slopes = beta / x_std
+        intercept = self.y_mean - np.einsum("mi,mi->m", mean_std, beta)
+        var_slopes = scale[:, None] * np.diagonal(inv, axis1=1, axis2=2)
+        var_int = scale * (
+            1 / n + np.einsum("mi,mij,mj->m", mean_std, inv, mean_std)
+        )
+        params = np.column_stack([intercept, slopes])
+        bse = np.sqrt(np.column_stack([var_int, var_slopes])) / np.column_stack(
+            [np.ones(n_models), x_std]
+        )
+        tvalues = params / bse
+        pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid[:, None])
+
+        # BP and JB are always reported, like `modeling.summarize`.
+        raw_cols = np.column_stack([np.zeros(n_models, dtype=int), cols + 1])
+        tests = self.diagnostics.run(raw_cols, resid, ("bp", "jb"))
+        omni = _skew_z(tests["skew"], n) ** 2 + _kurtosis_z(tests["kurtosis"], n) ** 2
+        omnipv = stats.chi2.sf(omni, 2)
+
+        raw_gram = self.raw_gram[raw_cols[:, :, None], raw_cols[:, None, :]]
+        # Rounding can push the smallest eigenvalue of a singular design
+        # below zero; statsmodels' singular values are never negative.
+        eigvals = np.abs(np.linalg.eigvalsh(raw_gram))
+        eigvals.sort(axis=1)
+        condno = np.sqrt(eigvals[:, -1] / eigvals[:, 0])
+
+        high = self.high[cols[:, :, None], cols[:, None, :]]
+        return dict(
+            rsquared=rsquared,
+            rsquared_adj=rsquared_adj,
+            fval=fval,
+            f_pval=f_pval,
+            omni=omni,
+            omnipv=omnipv,
+            condno=condno,
+            mineigval=eigvals[:, 0],
+            params=params,
+            pvalues=pvalues,
+            high_corr_exog=high.sum(axis=(1, 2)) // 2,
+            bad_pvals=(pvalues >= 0.05).sum(axis=1),
+            resid=resid,
+            raw_cols=raw_cols,
+            **tests,
+        )
+
+    def _summarize_group(self, combos: list, cols: np.ndarray, tests=()) -> list:
+        fit = self._fit_group(cols)
+        # BP and JB are already part of every fit.
+        diag_tests = [x for x in tests if x in {"white", "gq"}]
+        extra = dict()
+        if diag_tests:
+            extra = self.diagnostics.run(fit["raw_cols"], fit["resid"], diag_tests)
+        if "cv" in tests:
+            extra.update(self.folds.scores(fit["raw_cols"]))
+        extra_names = list(extra)
+        extra = np.column_stack(list(extra.values())) if extra else None
+        summaries = []
+        for i, combo in enumerate(combos):
+            names = ["Intercept"] + self.names[cols[i]].tolist()
+            results = [
+                fit["rsquared"][i],
+                fit["rsquared_adj"][i],
+                fit["fval"][i],
+                fit["f_pval"][i],
+                float(self.nobs),
+                fit["jb"][i],
+                fit["jbpv"][i],
+                fit["skew"][i],
+                fit["kurtosis"][i],
+                fit["omni"][i],
+                fit["omnipv"][i],
+                fit["condno"][i],
+                fit["mineigval"][i],
+                *fit["pvalues"][i],
+                *fit["params"][i],
+                fit["bp_lm"][i],
+                fit["bp_lm_pval"][i],
+                fit["bp_f_val"][i],
+                fit["bp_f_pval"][i],
+                fit["bp_lm_pval"][i] < 0.05,
+                fit["high_corr_exog"][i],
+                fit["bad_pvals"][i],
+            ]
+            index = [
+                "rsquared",
+                "rsquared_adj",
+                "fval",
+                "f_pval",
+                "nobs",
+                "jb",
+                "jbpv",
+                "skew",
+                "kurtosis",
+                "omni",
+                "omnipv",
+                "condno",
+                "mineigval",
+                *[f"pval_{x}" for x in names],
+                *[f"coef_{x}" for x in names],
+                "bp_lm",
+                "bp_lm_pval",
+                "bp_f_val",
+                "bp_f_pval",
+                "bp_hetero",
+                "high_corr_exog",
+                "bad_pvals",
+            ]
+            if extra_names:
+                results += extra[i].tolist()
+                index += extra_names
+            summaries.append(pd.Series(results, index=index, dtype=object))
+        return summaries
+
+    def sweep(self, combos, batch_size=256, tests=()):
+        """Yields (formula, summary) pairs for each combination of terms.
+
+        Args:
+            combos (iterable): Tuples of terms, one per model.
+            batch_size (int, optional): Models solved per vectorized batch.
+                Defaults to 256.
+            tests (tuple, optional): Tests from `diagnostics.TESTS` to add
+                besides BP and JB, which are always included, e.g.
+                ("white", "gq"), and/or "cv" for k-fold scores (see
+                `crossval`). Defaults to ().
+
+        Yields:
+            tuple: Formula string and Series matching `modeling.summarize`.
+        """
+        groups = defaultdict(list)
+        for combo in combos:
+            cols = self._columns(combo)
+            group = groups[cols.size]
+            group.append((combo, cols))
+            if len(group) == batch_size:
+                yield from self._flush(group, tests)
+                group.clear()
+        for group in groups.values():
+            if group:
+                yield from self._flush(group, tests)
+
+    def _flush(self, group, tests=()):
+        combos, cols = zip(*group)
+        summaries = self._summarize_group(combos, np.vstack(cols), tests)
+        for combo, summary in zip(combos, summaries):
+            yield self.formula(combo), summary
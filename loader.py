@@ -0,0 +1,148 @@
+"""Typed, cached loading of the King County datasets.
+
+The raw CSV is read with explicit compact dtypes, and the processed
+`*_kc_house_data.pkl.bz2` pickles keep their own dtypes. Either way, the
+first load writes an uncompressed Feather copy to CACHE_DIR, keyed by a hash
+of the source file. Later loads memory-map that copy instead of parsing CSV
+or decompressing bz2, and a changed source file gets a new key.
+"""
+import glob
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+DATA_DIR = "data"
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+RAW_PATH = os.path.join(DATA_DIR, "kc_house_data.csv")
+# Bump to invalidate every cache entry, e.g. after changing RAW_DTYPES.
+CACHE_VERSION = 1
+
+RAW_DTYPES = {
+    "id": np.int64,
+    "price": np.float32,
+    "bedrooms": np.int32,
+    "bathrooms": np.float32,
+    "sqft_living": np.int32,
+    "sqft_lot": np.int32,
+    "floors": np.float32,
+    "waterfront": np.float32,
+    "view": pd.CategoricalDtype(range(5), ordered=True),
+    "condition": pd.CategoricalDtype(range(1, 6), ordered=True),
+    "grade": pd.CategoricalDtype(range(1, 14), ordered=True),
+    "sqft_above": np.int32,
+    "sqft_basement": np.float32,
+    "yr_built": np.int32,
+    "yr_renovated": np.float32,
+    "zipcode": np.int32,
+    "lat": np.float64,
+    "long": np.float64,
+    "sqft_living15": np.int32,
+    "sqft_lot15": np.int32,
+}
+
+
+def read_raw(path: str = RAW_PATH) -> pd.DataFrame:
+    """Read the raw King County CSV with compact, explicit dtypes.
+
+    Args:
+        path (str, optional): Path to the CSV. Defaults to RAW_PATH.
+
+    Returns:
+        pd.DataFrame: Raw data with "date" parsed and "zipcode" categorical.
+    """
+    data = pd.read_csv(
+        path,
+        dtype=RAW_DTYPES,
+        na_values={"sqft_basement": "?"},
+        parse_dates=["date"],
+        infer_datetime_format=True,
+    )
+    data["zipcode"] = data["zipcode"].astype("category")
+    return data
+
+
+def _file_key(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"{CACHE_VERSION}:{os.path.basename(path)}".encode())
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(2 ** 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_path(path: str, key: str) -> str:
+    stem = os.path.basename(path).split(".")[0]
+    ext = ".feather" if feather is not None else ".pkl"
+    return os.path.join(CACHE_DIR, f"{stem}.{key}{ext}")
+
+
+def _write_cache(data: pd.DataFrame, path: str):
+    tmp_path = f"{path}.tmp"
+    if feather is None:
+        data.to_pickle(tmp_path, compression=None, protocol=5)
+    else:
+        table = pa.Table.from_pandas(data)
+        # Arrow loses some category dtypes (e.g. booleans), so keep the originals.
+        metadata = dict(table.schema.metadata or {})
+        metadata[b"dtypes"] = pickle.dumps(data.dtypes.to_dict())
+        table = table.replace_schema_metadata(metadata)
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def _read_cache(path: str) -> pd.DataFrame:
+    if path.endswith(".pkl"):
+        return pd.read_pickle(path, compression=None)
+    table = feather.read_table(path, memory_map=True)
+    data = table.to_pandas()
+    dtypes = pickle.loads(table.schema.metadata[b"dtypes"])
+    changed = {k: v for k, v in dtypes.items() if data[k].dtype != v}
+    return data.astype(changed) if changed else data
+
+
+def load(name: str = "raw", cache: bool = True) -> pd.DataFrame:
+    """Load a King County dataset, from the on-disk cache when possible.
+
+    Args:
+        name (str, optional): "raw" for the CSV, or the prefix of a processed
+            pickle, e.g. "scrubbed" for "scrubbed_kc_house_data.pkl.bz2".
+            Defaults to "raw".
+        cache (bool, optional): Read and write the cache. Defaults to True.
+
+    Returns:
+        pd.DataFrame: The dataset.
+    """
+    if name == "raw":
+        path, reader = RAW_PATH, read_raw
+    else:
+        path = os.path.join(DATA_DIR, f"{name}_kc_house_data.pkl.bz2")
+        reader = pd.read_pickle
+    if not cache:
+        return reader(path)
+    cache_path = _cache_path(path, _file_key(path))
+    if os.path.exists(cache_path):
+        return _read_cache(cache_path)
+    data = reader(path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Entries for older versions of the source are stale now.
+    stem = os.path.basename(path).split(".")[0]
+    for stale in glob.glob(os.path.join(CACHE_DIR, f"{stem}.*")):
+        os.remove(stale)
+    _write_cache(data, cache_path)
+    return data
+
+
+def clear_cache():
+    """Delete every cached dataset."""
+    for path in glob.glob(os.path.join(CACHE_DIR, "*")):
+        os.remove(path)
@@ -0,0 +1,62 @@
+"""Minimum-norm least squares for batches of Gram matrices.
+
+Each Gram matrix X'X is scaled to a unit diagonal and pseudo-inverted through
+its eigendecomposition, dropping directions with tiny eigenvalues, so
+rank-deficient models are handled like statsmodels' pinv-based fit. This
+module imports nothing else from the package, so every batched engine can
+share it.
+"""
+import numpy as np
+
+# Eigenvalues below this fraction of the largest are treated as zero.
+RANK_TOL = 1e-10
+
+
+def _scaled_eigh(gram: np.ndarray) -> tuple:
+    """Returns eigenvectors, pseudo-inverted eigenvalues and scales of a batch.
+
+    Args:
+        gram (np.ndarray): (..., n_cols, n_cols) Gram matrices X'X.
+
+    Returns:
+        tuple: Eigenvectors of the scaled Gram matrices, reciprocal eigenvalues
+        (zero for dropped directions), and the scale of each column.
+    """
+    norms = np.sqrt(np.diagonal(gram, axis1=-2, axis2=-1))
+    scale = np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)
+    gram = gram * scale[..., :, None] * scale[..., None, :]
+    eigvals, eigvecs = np.linalg.eigh(gram)
+    nonzero = eigvals > eigvals[..., -1:] * RANK_TOL
+    recip = np.divide(1, eigvals, out=np.zeros_like(eigvals), where=nonzero)
+    return eigvecs, recip, scale
+
+
+def pinv(gram: np.ndarray) -> tuple:
+    """Pseudo-inverses and ranks of a batch of Gram matrices.
+
+    Args:
+        gram (np.ndarray): (..., n_cols, n_cols) Gram matrices X'X.
+
+    Returns:
+        tuple: (..., n_cols, n_cols) pseudo-inverses and (...) ranks.
+    """
+    eigvecs, recip, scale = _scaled_eigh(gram)
+    inv = np.einsum("...ij,...j,...kj->...ik", eigvecs, recip, eigvecs)
+    inv *= scale[..., :, None] * scale[..., None, :]
+    return inv, (recip > 0).sum(axis=-1)
+
+
+def solve(gram: np.ndarray, xy: np.ndarray) -> tuple:
+    """Minimum-norm coefficients and ranks of a batch of least squares problems.
+
+    Args:
+        gram (np.ndarray): (..., n_cols, n_cols) Gram matrices X'X.
+        xy (np.ndarray): (..., n_cols) cross-products X'y.
+
+    Returns:
+        tuple: (..., n_cols) coefficients and (...) ranks.
+    """
+    eigvecs, recip, scale = _scaled_eigh(gram)
+    coords = np.einsum("...ij,...i->...j", eigvecs, xy * scale) * recip
+    coef = np.einsum("...ij,...j->...i", eigvecs, coords) * scale
+    return coef, (recip > 0).sum(axis=-1)
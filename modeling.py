@@ -1,12 +1,14 @@
 import datetime
 import glob
 import itertools
+import math
 import os
 import pickle
 import re
 import shutil
+import zipfile
 from functools import partial, singledispatch
-from multiprocessing.pool import ThreadPool
+from multiprocessing.pool import Pool, ThreadPool
 from operator import itemgetter
 from time import perf_counter
 
@@ -19,11 +21,87 @@ from sklearn.feature_selection import RFE, SequentialFeatureSelector
 from sklearn.linear_model import LinearRegression
 from statsmodels.formula.api import ols
 
+import corrcache
+import crossval
+import diagnostics
+import fastols
 import plotting
+import resultstore
+import selection
+import sketches
 import utils
 
 TEST_DIR = "test_models"
 OLS_SWEEP_DIR = os.path.join(TEST_DIR, "ols_sweep")
+BACKENDS = ("thread", "process", "serial")
+SUMMARY_FIELDS = (
+    "rsquared",
+    "rsquared_adj",
+    "fval",
+    "f_pval",
+    "nobs",
+    "diagn",
+    "pval",
+    "coef",
+    "bp",
+    "bp_hetero",
+    "high_corr_exog",
+    "bad_pvals",
+)
+# Fields which `summarize` only computes on request.
+OPTIONAL_FIELDS = ("white", "gq", "cv")
+# Summary fields named differently from the model attribute.
+_MODEL_ATTRS = {"fval": "fvalue", "f_pval": "f_pvalue"}
+
+# State of process workers, shipped once per pool rather than with every task.
+_shared = {}
+
+
+def _share(state):
+    _shared.update(state)
+
+
+def _call_shared(func, item):
+    return func(item, _shared)
+
+
+def _parallel_imap(func, items, backend="thread", jobs=os.cpu_count(), state=None):
+    """Lazily map `func` over `items`, giving every worker `state` once.
+
+    Threads and serial runs pass `state` directly, so concurrent or nested
+    maps never share it. Processes receive it once per pool.
+
+    Args:
+        func (callable): Module-level function called as `func(item, state)`.
+        items (iterable): Tasks to map over.
+        backend (str, optional): "thread", "process", or "serial". Defaults to "thread".
+        jobs (int, optional): Number of workers to create. Defaults to os.cpu_count().
+        state (dict, optional): Shared state for the workers. Defaults to None.
+
+    Yields:
+        object: Results in the order of `items`.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"`backend` must be one of {BACKENDS}, got '{backend}'")
+    items = list(items)
+    state = state or dict()
+    if backend == "process" and jobs > 1:
+        # Chunk tasks so each worker receives a few large batches.
+        chunksize = max(1, math.ceil(len(items) / (jobs * 4)))
+        with Pool(jobs, initializer=_share, initargs=(state,)) as pool:
+            yield from pool.imap(partial(_call_shared, func), items, chunksize)
+        return
+    func = partial(func, state=state)
+    if backend == "serial" or jobs <= 1:
+        yield from map(func, items)
+    else:
+        with ThreadPool(jobs) as pool:
+            yield from pool.imap(func, items)
+
+
+def _parallel_map(func, items, backend="thread", jobs=os.cpu_count(), state=None):
+    """Like `_parallel_imap`, but returns a list."""
+    return list(_parallel_imap(func, items, backend, jobs, state))
 
 
 def ols_model(data, formula):
@@ -37,28 +115,107 @@ def ols_model(data, formula):
     return model
 
 
-def _build_and_record(data, formula, path):
-    model = ols(formula=formula, data=data).fit()
-    summary = summarize(model)
-    summary.to_json(path)
-
-
-def summarize(model):
-    model.summary()
-    results = pd.Series(dtype=np.float64)
-    results["rsquared"] = model.rsquared
-    results["rsquared_adj"] = model.rsquared_adj
-    results["fval"] = model.fvalue
-    results["f_pval"] = model.f_pvalue
-    results["nobs"] = model.nobs
-    results = results.append(pd.Series(model.diagn))
-    results = results.append(model.pvalues.add_prefix("pval_"))
-    results = results.append(model.params.add_prefix("coef_"))
-    results = results.append(breusch_pagan(model).add_prefix("bp_"))
-    results["bp_hetero"] = results["bp_lm_pval"] < 0.05
-    results["high_corr_exog"] = check_multicol(model).sum().sum()
-    results["bad_pvals"] = bad_pvalues(model).size
-    return results
+def _fit_summary_shared(formula, state):
+    model = ols(formula=formula, data=state["data"]).fit()
+    fields = state.get("fields", SUMMARY_FIELDS)
+    return [(formula, summarize(model, fields=fields, corr=state.get("corr")))]
+
+
+def _gram_summary_shared(combos, state):
+    return list(state["gram"].sweep(combos, tests=state.get("tests", ())))
+
+
+def summarize(model, fields=SUMMARY_FIELDS, corr=None, high_corr=0.7):
+    """Summarize a fitted OLS model as one flat Series.
+
+    Only the requested fields are computed, and the text summary is never
+    rendered, so this is cheap enough to call for every model in a sweep.
+
+    Args:
+        model (RegressionResultsWrapper): Statsmodels regression results.
+        fields (tuple, optional): Any of SUMMARY_FIELDS and OPTIONAL_FIELDS.
+            "diagn", "pval", "coef", "bp", "white", "gq" (see `gq_summary`)
+            and "cv" (see `crossval`) are groups of fields. Defaults to
+            SUMMARY_FIELDS.
+        corr (pd.DataFrame, optional): Precomputed correlations of the exog
+            (e.g. from `fastols.design_corr` on the same rows), used for
+            "high_corr_exog" instead of recomputing them. Defaults to None.
+        high_corr (float, optional): Threshold for "high_corr_exog". Defaults to 0.7.
+
+    Returns:
+        pd.Series: Summary statistics.
+    """
+    unknown = set(fields) - set(SUMMARY_FIELDS) - set(OPTIONAL_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {sorted(unknown)}")
+    keys, values = [], []
+    if {"bp", "bp_hetero"} & set(fields):
+        bp = breusch_pagan(model)
+    for field in fields:
+        if field == "diagn":
+            diagn = _diagnostics(model)
+            keys += diagn.keys()
+            values += diagn.values()
+        elif field in {"pval", "coef"}:
+            stat = model.pvalues if field == "pval" else model.params
+            keys += [f"{field}_{x}" for x in stat.index]
+            values += stat.to_list()
+        elif field == "bp":
+            keys += [f"bp_{x}" for x in bp.index]
+            values += bp.to_list()
+        elif field == "bp_hetero":
+            keys.append(field)
+            values.append(bp["lm_pval"] < 0.05)
+        elif field == "high_corr_exog":
+            keys.append(field)
+            values.append(_count_high_corrs(model, corr, high_corr))
+        elif field == "bad_pvals":
+            keys.append(field)
+            values.append(bad_pvalues(model).size)
+        elif field == "white":
+            exog = model.model.exog
+            white_stats = diagnostics.diagnose(
+                exog, np.arange(exog.shape[1]), model.resid.to_numpy(), ["white"]
+            )
+            keys += white_stats.keys()
+            values += [x[0] for x in white_stats.values()]
+        elif field == "gq":
+            gq = gq_summary(model)
+            keys += [f"gq_{x}" for x in gq.index]
+            values += gq.to_list()
+        elif field == "cv":
+            cv = crossval.cross_validate(model.model.exog, model.model.endog)
+            keys += cv.keys()
+            values += cv.values()
+        else:
+            keys.append(field)
+            values.append(getattr(model, _MODEL_ATTRS.get(field, field)))
+    return pd.Series(values, index=keys, dtype=object)
+
+
+def _diagnostics(model) -> dict:
+    """Returns the residual diagnostics which `model.summary()` stores as `diagn`."""
+    jb, jbpv, skew, kurtosis = sms.jarque_bera(model.wresid)
+    omni, omnipv = sms.omni_normtest(model.wresid)
+    return dict(
+        jb=jb,
+        jbpv=jbpv,
+        skew=skew,
+        kurtosis=kurtosis,
+        omni=omni,
+        omnipv=omnipv,
+        condno=model.condition_number,
+        mineigval=model.eigenvals[-1],
+    )
+
+
+def _count_high_corrs(model, corr=None, high_corr=0.7) -> int:
+    """Count exog pairs correlated at `high_corr` or above."""
+    names = [x for x in model.model.exog_names if x != "Intercept"]
+    if corr is None or not set(names).issubset(corr.index):
+        return check_multicol(model, high_corr=high_corr).sum().sum()
+    sub = corr.loc[names, names].to_numpy()
+    return np.count_nonzero(np.tril(sub >= high_corr, -1))
 
 
 def load_results(glob_path, jobs=os.cpu_count()):
@@ -71,25 +228,101 @@ def load_results(glob_path, jobs=os.cpu_count()):
     return list(zip(formulae, docs))
 
 
-def load_results_as_frame(glob_path):
-    results = load_results(glob_path)
-    df = pd.DataFrame(dict(results))
-    df.index.name = "formula"
-    return df.loc[df.notnull().all(axis=1)].T
+def load_results_as_frame(path, columns=None):
+    """Load sweep results as a DataFrame indexed by formula.
+
+    Args:
+        path (str): Result store written by `ols_sweep`, or a glob of
+            legacy per-formula JSON files.
+        columns (list, optional): Columns to read from a columnar store.
+            Defaults to the fields shared by every model.
+
+    Returns:
+        pd.DataFrame: One row per formula.
+    """
+    if resultstore.is_store(path):
+        df = resultstore.read_results(path, columns=columns)
+    else:
+        df = pd.concat(iter_results(path, columns=columns))
+        df.index.name = "formula"
+    return df if columns else df.loc[:, df.notnull().all()]
+
+
+def iter_results(path, columns=None, batch_size=1024, jobs=os.cpu_count()):
+    """Iterate over sweep results in batches, as they are read.
+
+    Args:
+        path (str): Result store written by `ols_sweep`, or a glob of
+            legacy per-formula JSON files.
+        columns (list, optional): Columns to read. Defaults to all.
+        batch_size (int, optional): JSON files per batch. Columnar stores are
+            read in their stored batches. Defaults to 1024.
+        jobs (int, optional): Number of threads reading JSON. Defaults to os.cpu_count().
+
+    Yields:
+        pd.DataFrame: Results indexed by formula.
+    """
+    if resultstore.is_store(path):
+        yield from resultstore.iter_results(path, columns=columns)
+        return
+    if os.path.isdir(path):
+        path = os.path.join(path, "*")
+    paths = glob.glob(path)
+    read_json = partial(pd.read_json, typ="Series")
+    with ThreadPool(jobs) as pool:
+        for start in range(0, len(paths), batch_size):
+            batch_paths = paths[start : start + batch_size]
+            docs = pool.map(read_json, batch_paths)
+            fnames = map(os.path.basename, batch_paths)
+            formulae, _ = zip(*map(os.path.splitext, fnames))
+            batch = pd.DataFrame.from_dict(dict(zip(formulae, docs)), orient="index")
+            yield batch if columns is None else batch.reindex(columns=columns)
 
 
-def consolidate_results(glob_path):
+def consolidate_results(path):
+    """Write the results of a sweep to its "_summary.json".
+
+    Rows are merged into an existing summary, replacing older rows for the
+    same formula. Legacy JSON directories are then added to their zip archive
+    and deleted.
+
+    Args:
+        path (str): Result store written by `ols_sweep`, or a glob of legacy
+            per-formula JSON files.
+    """
     start = perf_counter()
-    df = load_results_as_frame(glob_path)
-    first_path = glob.glob(glob_path)[0]
-    dir_ = os.path.dirname(first_path)
-    path = f"{dir_}_summary.json"
-    df.to_json(path)
-    shutil.make_archive(dir_, "zip", dir_)
-    shutil.rmtree(dir_)
+    is_store = resultstore.is_store(path)
+    if is_store:
+        root = os.path.splitext(path)[0]
+    elif os.path.isdir(path):
+        # A "json" store is the directory of its per-formula files.
+        root, path = path, os.path.join(path, "*")
+    else:
+        root = os.path.dirname(path)
+    summary_path = f"{root}_summary.json"
+    if is_store or glob.glob(path):
+        df = load_results_as_frame(path)
+        if os.path.isfile(summary_path):
+            old = pd.read_json(summary_path)
+            df = pd.concat([old.loc[~old.index.isin(df.index)], df])
+            df = df.loc[:, df.notnull().all()]
+        df.to_json(summary_path)
+    if not is_store and os.path.isdir(root):
+        with zipfile.ZipFile(f"{root}.zip", "a", zipfile.ZIP_DEFLATED) as archive:
+            for file_path in glob.glob(os.path.join(root, "*")):
+                archive.write(file_path, os.path.basename(file_path))
+        shutil.rmtree(root)
     print(utils.elapsed(start))
 
 
+def _sweep_terms(data, target):
+    """Returns the predictor terms of a sweep, with "C(x)" for categoricals."""
+    var_names = utils.noncat_cols(data)
+    var_names += [f"C({x})" for x in utils.cat_cols(data)]
+    var_names.remove(target)
+    return var_names
+
+
 @singledispatch
 def _strip_patsy_cat(feature: str):
     match = re.fullmatch(r"C\((\w+)\)", feature.strip())
@@ -101,65 +334,348 @@ def _(feature: list):
     return list(map(_strip_patsy_cat, feature))
 
 
-def feature_summary(sweep_results, agg=np.mean, filter_mc=True):
+def _formula_features(formulae: pd.Index) -> pd.Series:
+    """Returns the list of features in each formula, indexed by formula."""
+    feature = formulae.to_series(name="feature")
+    feature = feature.str.split("~").map(itemgetter(1)).str.split("+")
+    return feature.map(_strip_patsy_cat)
+
+
+def feature_summary(
+    sweep_results, agg=np.mean, filter_mc=True, sort_by=None, ascending=False
+):
+    """Aggregate sweep results over the models containing each feature.
+
+    Args:
+        sweep_results (pd.DataFrame): Results indexed by formula, e.g. from
+            `load_results_as_frame`.
+        agg (callable or str, optional): Aggregation. Defaults to np.mean.
+        filter_mc (bool, optional): Drop models with correlated exog. Defaults to True.
+        sort_by (str, optional): Field to sort features by, e.g. the
+            out-of-sample "cv_rsquared" of a sweep run with `tests=("cv",)`.
+            Defaults to None.
+        ascending (bool, optional): Sort smallest first, e.g. for "cv_rmse".
+            Defaults to False.
+
+    Returns:
+        pd.DataFrame: Aggregates indexed by feature.
+    """
     summ = sweep_results.copy()
     if filter_mc:
         summ = summ.query("high_corr_exog < 1")
-    feature = summ.index.to_series(name="feature")
-    feature = feature.str.split("~").map(itemgetter(1)).str.split("+")
-    feature = feature.map(_strip_patsy_cat)
-    summ = summ.join(feature)
-    return summ.explode("feature").groupby("feature").agg(agg)
+    summ = summ.join(_formula_features(summ.index))
+    summ = summ.explode("feature").groupby("feature").agg(agg)
+    if sort_by is not None:
+        summ = summ.sort_values(sort_by, ascending=ascending)
+    return summ
 
 
-def rfe_feature_ranking(data, target, dummify_cats=False, n_features=None, ignore=None):
-    if ignore:
-        data = data.drop(columns=ignore)
-    predictors = data.drop(columns=target)
-    if dummify_cats:
-        dummies = pd.get_dummies(
-            predictors.select_dtypes(include="category"), drop_first=True
+def stream_feature_summary(batches, agg="mean", filter_mc=True, k=200):
+    """Like `feature_summary`, but over batches of results in bounded memory.
+
+    Keeps running moments for means and KLL sketches for medians (see
+    `sketches`) for each feature, so medians are approximate.
+
+    Args:
+        batches (iterable): DataFrames of results indexed by formula, e.g.
+            from `iter_results`.
+        agg (str or list, optional): "mean", "median", or a list of them. Defaults to "mean".
+        filter_mc (bool, optional): Drop models with correlated exog. Defaults to True.
+        k (int, optional): Sketch level capacity; larger is more accurate. Defaults to 200.
+
+    Returns:
+        pd.DataFrame: Aggregates indexed by feature, with (field, agg)
+        columns if `agg` is a list.
+    """
+    aggs = [agg] if isinstance(agg, str) else list(agg)
+    if not set(aggs) <= {"mean", "median"}:
+        raise ValueError(f"`agg` must be 'mean' and/or 'median', got {agg}")
+    columns, moments, medians = None, dict(), dict()
+    for batch in batches:
+        if filter_mc:
+            batch = batch.query("high_corr_exog < 1")
+        if columns is None:
+            columns = batch.select_dtypes(include=["number", "bool"]).columns
+        features = _formula_features(batch.index).explode()
+        values = batch.reindex(columns=columns).to_numpy(np.float64)
+        values = values[batch.index.get_indexer(features.index)]
+        codes, uniques = pd.factorize(features.to_numpy())
+        for code, feature in enumerate(uniques):
+            rows = values[codes == code]
+            if "mean" in aggs:
+                moments.setdefault(feature, sketches.RunningMoments(len(columns)))
+                moments[feature].update(rows)
+            if "median" in aggs:
+                medians.setdefault(feature, sketches.KLLSketch(len(columns), k=k))
+                medians[feature].update(rows)
+    index = pd.Index(sorted(moments or medians), name="feature")
+    frames = dict()
+    if "mean" in aggs:
+        means = [np.where(moments[x].count > 0, moments[x].mean, np.nan) for x in index]
+        frames["mean"] = pd.DataFrame(means, index=index, columns=columns)
+    if "median" in aggs:
+        median_vals = [medians[x].quantile(0.5) for x in index]
+        frames["median"] = pd.DataFrame(median_vals, index=index, columns=columns)
+    if isinstance(agg, str):
+        return frames[agg]
+    summ = pd.concat(frames, axis=1).swaplevel(axis=1)
+    return summ.reindex(columns=pd.MultiIndex.from_product([columns, aggs]))
+
+
+def rfe_feature_ranking(
+    data,
+    target,
+    dummify_cats=False,
+    n_features=None,
+    ignore=None,
+    engine="sklearn",
+    sparse=False,
+):
+    """Rank predictors by recursive feature elimination with linear regression.
+
+    Args:
+        data (pd.DataFrame): Data for modeling.
+        target (str): Name of the endogenous variable.
+        dummify_cats (bool, optional): Add drop-first dummies of categorical
+            columns. Defaults to False.
+        n_features (int, optional): Number of features ranked first. Defaults
+            to half of them.
+        ignore (list, optional): Columns to exclude. Defaults to None.
+        engine (str, optional): "sklearn" refits with `RFE`. "native"
+            downdates one factorization and caches the whole elimination path
+            (see `selection`), matching "sklearn" for predictors of full rank.
+            Collinear predictors, e.g. from `dummify_cats`, can be ranked
+            differently. Defaults to "sklearn".
+        sparse (bool, optional): Keep the dummies sparse for the "native"
+            engine. "sklearn" densifies them. Defaults to False.
+
+    Returns:
+        pd.Series: Rankings indexed by predictor, sorted.
+    """
+    if engine not in {"native", "sklearn"}:
+        raise ValueError(f"`engine` must be 'native' or 'sklearn', got '{engine}'")
+    predictors, endog = selection.predictors(
+        data, target, dummify_cats, ignore, sparse=sparse
+    )
+    if engine == "native":
+        _, path = selection.cached_rfe_path(
+            data, target, dummify_cats, ignore, sparse=sparse
         )
-        predictors = predictors.select_dtypes(include="number")
-        predictors = pd.concat([predictors, dummies], axis=1)
+        ranking = selection.rfe_ranking(path, n_features)
     else:
-        predictors = predictors.select_dtypes(include="number")
-    selector = RFE(estimator=LinearRegression(), n_features_to_select=n_features)
-    selector = selector.fit(predictors, data[target])
-    selected = selector.get_support(indices=True)
-    results = pd.Series(selector.ranking_, index=predictors.columns, name="RFE Ranking")
+        selector = RFE(estimator=LinearRegression(), n_features_to_select=n_features)
+        # sklearn fits sparse input with an iterative solver, so densify.
+        ranking = selector.fit(predictors.to_numpy(np.float64), endog).ranking_
+    results = pd.Series(ranking, index=predictors.columns, name="RFE Ranking")
     return results.sort_values()
 
 
-def seq_feature_selection(data, target, n_features=None):
-    predictors = data.drop(columns=target).select_dtypes(np.number)
-    selector = SequentialFeatureSelector(
-        estimator=LinearRegression(), n_features_to_select=n_features
-    )
-    selector = selector.fit(predictors, data[target])
-    selected = selector.get_support(indices=True)
+def seq_feature_selection(data, target, n_features=None, engine="sklearn"):
+    """Select predictors by forward sequential selection with linear regression.
+
+    Candidates are scored by mean 5-fold cross-validated R-squared.
+
+    Args:
+        data (pd.DataFrame): Data for modeling.
+        target (str): Name of the endogenous variable.
+        n_features (int, optional): Number of features to select. Defaults to
+            half of them.
+        engine (str, optional): "sklearn" refits with
+            `SequentialFeatureSelector`. "native" updates one factorization
+            per fold and caches the whole selection path (see `selection`),
+            matching "sklearn" for predictors of full rank. Defaults to "sklearn".
+
+    Returns:
+        list: Names of the selected predictors, in column order.
+    """
+    if engine not in {"native", "sklearn"}:
+        raise ValueError(f"`engine` must be 'native' or 'sklearn', got '{engine}'")
+    predictors, endog = selection.predictors(data, target)
+    if engine == "native":
+        names, (path, _) = selection.cached_forward_path(data, target)
+        n_features = names.size // 2 if n_features is None else n_features
+        selected = np.sort(path[:n_features])
+    else:
+        selector = SequentialFeatureSelector(
+            estimator=LinearRegression(), n_features_to_select=n_features
+        )
+        selector = selector.fit(predictors, endog)
+        selected = selector.get_support(indices=True)
     return predictors.iloc[:, selected].columns.to_list()
 
 
 def ols_sweep(
-    data, target, n_vars=2, ignore=None, dst=OLS_SWEEP_DIR, jobs=os.cpu_count()
+    data,
+    target,
+    n_vars=2,
+    ignore=None,
+    dst=OLS_SWEEP_DIR,
+    jobs=os.cpu_count(),
+    engine="formula",
+    backend="thread",
+    fmt="auto",
+    resume=True,
+    optimize=False,
+    tests=(),
+    sparse=False,
 ):
+    """Fit and record every OLS model with `n_vars` predictors.
+
+    Args:
+        data (pd.DataFrame): Data for modeling.
+        target (str): Name of the endogenous variable.
+        n_vars (int, optional): Number of predictors per model. Defaults to 2.
+        ignore (list, optional): Columns to exclude. Defaults to None.
+        dst (str, optional): Output directory. Defaults to OLS_SWEEP_DIR.
+        jobs (int, optional): Number of workers to create. Defaults to os.cpu_count().
+        engine (str, optional): "formula" fits each model with statsmodels,
+            "gram" solves batches of models from shared Gram matrices (see
+            `fastols`). "gram" drops rows missing any term for every model,
+            rather than per formula, and its coefficients and p-values for
+            rank-deficient models differ from statsmodels'. Defaults to "formula".
+        backend (str, optional): "thread", "process", or "serial". The data is
+            shipped to each process once. Defaults to "thread".
+        fmt (str, optional): Result store format: "parquet", "npy", or "json"
+            for one file per formula. "auto" picks Parquet if `pyarrow` is
+            installed. Defaults to "auto".
+        resume (bool, optional): Skip formulas already recorded for the same
+            data and `engine`, e.g. after an interrupted run or a change to
+            `ignore`. Otherwise start the store over. Defaults to True.
+        optimize (bool, optional): Downcast numeric columns of `data` first
+            (see `utils.optimize_memory`), so each worker holds less. Object
+            columns are kept, so formulas are unchanged. Defaults to False.
+        tests (tuple, optional): Extra fields to record for every model, any
+            of OPTIONAL_FIELDS, e.g. ("white", "gq"), or "cv" for 5-fold
+            out-of-sample RMSE and R-squared (see `crossval`). Defaults to ().
+        sparse (bool, optional): Build dummies of categorical terms as sparse
+            matrices for the "gram" engine and the shared correlations. Patsy
+            still builds each formula's design densely. Defaults to False.
+
+    Returns:
+        str: Path of the result store.
+    """
+    if engine not in {"formula", "gram"}:
+        raise ValueError(f"`engine` must be 'formula' or 'gram', got '{engine}'")
     start = perf_counter()
+    if not set(tests) <= set(OPTIONAL_FIELDS):
+        raise ValueError(f"`tests` must be among {OPTIONAL_FIELDS}, got {tests}")
+    tests = [x for x in OPTIONAL_FIELDS if x in tests]
+    # Fingerprint before dropping `ignore`, so changing it reuses results.
+    fingerprint = f"{utils.fingerprint(data)}:{engine}"
+    if engine == "gram":
+        # Rows missing any term are dropped for every model, so ignoring
+        # columns with missing values changes the rows.
+        ignored = [x for x in sorted(ignore or ()) if data[x].isna().any()]
+        if ignored:
+            fingerprint = f"{fingerprint}:{'+'.join(ignored)}"
+    if tests:
+        # Models recorded without these fields are fit again.
+        fingerprint = f"{fingerprint}:{'+'.join(tests)}"
     if ignore:
         data = data.drop(columns=ignore)
-    var_names = utils.noncat_cols(data)
-    var_names += [f"C({x})" for x in utils.cat_cols(data)]
-    var_names.remove(target)
-    combos = list(itertools.combinations(var_names, n_vars))
-    combo_strs = ["+".join(x) for x in combos]
-    formulae = [f"{target}~{x}" for x in combo_strs]
-    dst = os.path.join(dst, f"{target}~{n_vars}")
+    if optimize:
+        # Keep objects, which would otherwise become "C(x)" terms.
+        data = utils.optimize_memory(data, cat_ratio=0)
+    var_names = _sweep_terms(data, target)
+    fmt = resultstore.resolve_format(fmt)
+    path = resultstore.store_path(os.path.join(dst, f"{target}~{n_vars}"), fmt)
     os.makedirs(dst, exist_ok=True)
-    paths = [os.path.join(dst, f"{x}.json") for x in formulae]
-    with ThreadPool(jobs) as pool:
-        build = partial(_build_and_record, data)
-        pool.starmap(build, zip(formulae, paths))
+    index = resultstore.SweepIndex(resultstore.index_path(path))
+    if not resume or (fmt != "json" and not os.path.exists(path)):
+        resultstore.remove_store(path)
+        index.clear()
+    keys, combos = dict(), []
+    for combo in itertools.combinations(var_names, n_vars):
+        formula = f"{target}~{'+'.join(combo)}"
+        keys[formula] = resultstore.formula_key(formula, fingerprint)
+        if keys[formula] not in index:
+            combos.append(combo)
+    if not combos:
+        results = []
+    elif engine == "gram":
+        gram = fastols.GramOLS(data, target, var_names, sparse=sparse)
+        size = max(1, math.ceil(len(combos) / (jobs * 4)))
+        tasks = [combos[i : i + size] for i in range(0, len(combos), size)]
+        state = dict(gram=gram, tests=tests)
+        results = _parallel_imap(_gram_summary_shared, tasks, backend, jobs, state)
+    else:
+        formulae = [f"{target}~{'+'.join(x)}" for x in combos]
+        # One correlation matrix serves the multicollinearity check of every model.
+        corr = fastols.design_corr(
+            data.dropna(subset=[target]), var_names, sparse=sparse
+        )
+        fields = SUMMARY_FIELDS + tuple(tests)
+        state = dict(data=data, corr=corr, fields=fields)
+        results = _parallel_imap(_fit_summary_shared, formulae, backend, jobs, state)
+    columns = resultstore.schema(fastols.exog_names(data, var_names))
+    for test in tests:
+        columns += crossval.CV_FIELDS if test == "cv" else diagnostics.TEST_FIELDS[test]
+    with resultstore.ResultWriter(path, columns, fmt=fmt, index=index) as writer:
+        for formula, summary in itertools.chain.from_iterable(results):
+            writer.append(formula, summary, key=keys[formula])
+    print(utils.elapsed(start))
+    return path
+
+
+def ols_search(
+    data,
+    target,
+    max_vars=5,
+    top_k=10,
+    beam_width=50,
+    criterion="rsquared_adj",
+    ignore=None,
+    seed_rfe=False,
+    optimize=False,
+    sparse=False,
+):
+    """Find the best OLS models of each size without fitting every subset.
+
+    Runs a beam search over the same terms as `ols_sweep` (see
+    `fastols.GramOLS.search`) and summarizes only the winners.
+
+    Args:
+        data (pd.DataFrame): Data for modeling.
+        target (str): Name of the endogenous variable.
+        max_vars (int, optional): Largest number of predictors. Defaults to 5.
+        top_k (int, optional): Models to return per size. Defaults to 10.
+        beam_width (int, optional): Models extended per size. Defaults to 50.
+        criterion (str, optional): "rsquared_adj", "aic", or "bic". Defaults to "rsquared_adj".
+        ignore (list, optional): Columns to exclude. Defaults to None.
+        seed_rfe (bool, optional): Always score prefixes of the
+            `rfe_feature_ranking` order. Defaults to False.
+        optimize (bool, optional): Downcast numeric columns of `data` first
+            (see `utils.optimize_memory`). Defaults to False.
+        sparse (bool, optional): Keep dummies of categorical terms sparse (see
+            `fastols.GramOLS`). Defaults to False.
+
+    Returns:
+        pd.DataFrame: Summaries indexed by formula, like `load_results_as_frame`.
+    """
+    start = perf_counter()
+    if ignore:
+        data = data.drop(columns=ignore)
+    if optimize:
+        # Keep objects, which would otherwise become "C(x)" terms.
+        data = utils.optimize_memory(data, cat_ratio=0)
+    var_names = _sweep_terms(data, target)
+    gram = fastols.GramOLS(data, target, var_names, sparse=sparse)
+    seeds = None
+    if seed_rfe:
+        seeds = [rfe_feature_ranking(data, target).index.to_list()]
+    best = gram.search(
+        max_vars,
+        top_k=top_k,
+        beam_width=beam_width,
+        criterion=criterion,
+        seeds=seeds,
+    )
+    combos, scores = zip(*itertools.chain.from_iterable(best.values()))
+    results = pd.DataFrame.from_dict(dict(gram.sweep(combos)), orient="index")
+    results = results.loc[list(map(gram.formula, combos))].infer_objects()
+    results[criterion] = scores
     print(utils.elapsed(start))
+    return results.loc[:, results.notnull().all()]
 
 
 def goldfeld_quandt(
@@ -167,6 +683,8 @@ def goldfeld_quandt(
     split: float = 0.45,
     drop: float = 0.1,
     jobs: int = os.cpu_count(),
+    backend: str = "thread",
+    engine: str = "native",
 ) -> pd.DataFrame:
     """Run a battery of GQ tests, sorting by each exog variable in `model`.
 
@@ -174,47 +692,54 @@ def goldfeld_quandt(
         model (RegressionResultsWrapper): Statsmodels regression results.
         split (float, optional): Fraction of observations for split point. Defaults to 0.45.
         drop (float, optional): Fraction of observations to drop. Defaults to 0.1.
-        jobs (int, optional): Number of threads to create. Defaults to os.cpu_count().
+        jobs (int, optional): Number of workers for the "statsmodels" engine.
+            Defaults to os.cpu_count().
+        backend (str, optional): "thread", "process", or "serial", for the
+            "statsmodels" engine. Defaults to "thread".
+        engine (str, optional): "native" runs every test in one batch (see
+            `diagnostics.goldfeld_quandt`), "statsmodels" runs one
+            `het_goldfeldquandt` per variable. Defaults to "native".
 
     Returns:
         [pd.DataFrame]: DataFrame of results for each exog variable.
     """
+    if engine not in {"native", "statsmodels"}:
+        raise ValueError(f"`engine` must be 'native' or 'statsmodels', got '{engine}'")
     resid = model.resid
     exog = model.model.data.orig_exog
     resid, exog = resid.align(exog, axis=0)
     sort_cols = np.arange(exog.shape[1])
-
-    if jobs > 1:
-        gq = partial(
-            sms.het_goldfeldquandt,
-            resid.to_numpy(),
-            exog.to_numpy(),
-            alternative="two-sided",
-            split=split,
-            drop=drop,
+    if engine == "native":
+        fvals, pvals = diagnostics.goldfeld_quandt(
+            resid.to_numpy(), exog.to_numpy(), split=split, drop=drop
+        )
+        all_results = pd.DataFrame(
+            dict(f_val=fvals, p_val=pvals, hypothesis="two-sided"), index=sort_cols
         )
-        with ThreadPool(jobs) as pool:
-            all_results = pool.map(lambda x: gq(idx=x), sort_cols)
     else:
-        all_results = []
-        for idx in sort_cols:
-            results = sms.het_goldfeldquandt(
-                resid.to_numpy(),
-                exog.to_numpy(),
-                idx=idx,
-                alternative="two-sided",
-                split=split,
-                drop=drop,
-            )
-            all_results.append(results)
-    all_results = pd.DataFrame(
-        all_results, columns=["f_val", "p_val", "hypothesis"], index=sort_cols
-    )
+        state = dict(
+            resid=resid.to_numpy(), exog=exog.to_numpy(), split=split, drop=drop
+        )
+        all_results = _parallel_map(_gq_shared, sort_cols, backend, jobs, state)
+        all_results = pd.DataFrame(
+            all_results, columns=["f_val", "p_val", "hypothesis"], index=sort_cols
+        )
     all_results.index = all_results.index.map(lambda x: exog.columns.values[x])
     all_results.index.name = "sort_by"
     return all_results.sort_values("p_val")
 
 
+def _gq_shared(idx, state):
+    return sms.het_goldfeldquandt(
+        state["resid"],
+        state["exog"],
+        idx=idx,
+        alternative="two-sided",
+        split=state["split"],
+        drop=state["drop"],
+    )
+
+
 def gq_summary(model, split=0.45, drop=0.1):
     results = goldfeld_quandt(model, split=split, drop=drop)
     n_hetero = (results["p_val"] < 0.05).sum()
@@ -242,10 +767,16 @@ def jarque_bera(model):
     return pd.Series(results, index=["jb", "p_val", "skew", "kurt"])
 
 
+def _exog_corr(model) -> pd.DataFrame:
+    """Correlations of the exog, on the rows the model was fit on."""
+    names = np.array(model.model.exog_names, dtype=object)
+    slopes = names != "Intercept"
+    corr = corrcache.pearson(model.model.exog[:, slopes])
+    return pd.DataFrame(corr, index=names[slopes], columns=names[slopes])
+
+
 def check_multicol(model, high_corr=0.7):
-    regs = pd.DataFrame(model.model.exog, columns=model.model.exog_names)
-    regs.drop(columns="Intercept", inplace=True)
-    corr_df = regs.corr() >= high_corr
+    corr_df = _exog_corr(model) >= high_corr
     mask = np.triu(np.ones_like(corr_df), 0)
     masked_df = pd.DataFrame(np.ma.MaskedArray(corr_df.values, mask=mask))
     masked_df.index = corr_df.index
@@ -259,11 +790,14 @@ def bad_pvalues(model, alpha=0.05):
 
 
 def corr(frame: pd.DataFrame, other: pd.DataFrame):
-    return other.apply(lambda x: frame.corrwith(x))
+    if frame.columns.intersection(other.columns).size:
+        return other.apply(lambda x: frame.corrwith(x))
+    joined = pd.concat([frame, other], axis=1)
+    return corrcache.get(joined, index=frame.columns, columns=other.columns)
 
 
 def get_high_corrs(data, high_corr=0.7):
-    corr_df = data.corr()
+    corr_df = corrcache.get(data)
     mask = np.tril(np.ones_like(corr_df, dtype=np.bool_))
     corr_df = corr_df.mask(mask).stack()
     high_mask = corr_df >= high_corr
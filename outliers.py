@@ -1,12 +1,33 @@
+import warnings
 from functools import singledispatch
 
 import numpy as np
 import pandas as pd
-from pandas.api.types import is_integer, is_integer_dtype, is_float_dtype
+from pandas.api.types import is_integer, is_integer_dtype
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import StandardScaler
+from sklearn.utils.validation import check_is_fitted
 
+import sketches
 import utils
 
+try:
+    from IPython.display import display
+except ImportError:
+    display = print
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
 _rng = np.random.default_rng(42)
 
 
@@ -41,15 +62,84 @@ def iqr_fences(data: pd.Series) -> tuple:
     return lower, upper
 
 
-def _display_report(outliers, verb):
-    if isinstance(outliers, pd.Series):
-        outliers = outliers.to_frame()
-    report = outliers.sum()
-    n_modified = outliers.any(axis=1).sum()
-    report["total_obs"] = n_modified
-    report = report.to_frame(f"n_{verb}")
-    report[f"pct_{verb}"] = (report.squeeze() / outliers.shape[0]) * 100
-    display(report)
+def _frame_fences(values: np.ndarray) -> tuple:
+    """Returns arrays of lower and upper Tukey fences for each column of `values`."""
+    with warnings.catch_warnings():
+        # All-NaN columns get NaN fences, which flag nothing.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def _winsor_bounds(values: np.ndarray) -> tuple:
+    """Returns the outermost inlying values of each column and the outlier mask."""
+    lower, upper = _frame_fences(values)
+    outliers = (values < lower) | (values > upper)
+    inliers = np.where(outliers, np.nan, values)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmin(inliers, axis=0), np.nanmax(inliers, axis=0), outliers
+
+
+def _float_values(data: pd.DataFrame) -> np.ndarray:
+    return data.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _restore_dtypes(clipped: np.ndarray, data: pd.DataFrame) -> pd.DataFrame:
+    """Wrap `clipped` like `data`, rounding integer columns back to their dtype."""
+    int_mask = data.dtypes.map(is_integer_dtype).to_numpy()
+    clipped[:, int_mask] = np.round(clipped[:, int_mask])
+    clipped = pd.DataFrame(clipped, index=data.index, columns=data.columns)
+    return clipped.astype(data.dtypes[int_mask].to_dict())
+
+
+class OutlierReport:
+    """Counts of the outliers handled by one call.
+
+    Args:
+        counts (pd.Series): Number of outliers in each column.
+        n_modified (int): Number of observations with any outlier.
+        n_obs (int): Total number of observations.
+        verb (str): What was done to the outliers, e.g. "clipped".
+    """
+
+    def __init__(self, counts: pd.Series, n_modified: int, n_obs: int, verb: str):
+        self.counts = counts
+        self.n_modified = int(n_modified)
+        self.n_obs = int(n_obs)
+        self.verb = verb
+
+    @classmethod
+    def from_mask(cls, outliers, verb: str) -> "OutlierReport":
+        """Build a report from a boolean Series or DataFrame of outliers."""
+        if isinstance(outliers, pd.Series):
+            outliers = outliers.to_frame()
+        values = outliers.to_numpy()
+        counts = pd.Series(values.sum(axis=0), index=outliers.columns)
+        return cls(counts, values.any(axis=1).sum(), values.shape[0], verb)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns counts and percentages per column, plus "total_obs"."""
+        counts = self.counts.to_list() + [self.n_modified]
+        index = self.counts.index.to_list() + ["total_obs"]
+        report = pd.Series(counts, index=index).to_frame(f"n_{self.verb}")
+        report[f"pct_{self.verb}"] = report.squeeze() / self.n_obs * 100
+        return report
+
+    def __repr__(self) -> str:
+        return repr(self.to_frame())
+
+    def _repr_html_(self) -> str:
+        return self.to_frame()._repr_html_()
+
+
+def _report(outliers, verb: str, silent: bool) -> OutlierReport:
+    """Build a report from the mask already computed, displaying it unless `silent`."""
+    report = OutlierReport.from_mask(outliers, verb)
+    if not silent:
+        display(report.to_frame())
+    return report
 
 
 @singledispatch
@@ -69,128 +159,186 @@ def iqr_outliers(data: pd.Series) -> pd.Series:
 @iqr_outliers.register
 def _(data: pd.DataFrame) -> pd.DataFrame:
     """Function for DataFrames"""
-    return data.apply(iqr_outliers)
+    values = _float_values(data)
+    lower, upper = _frame_fences(values)
+    outliers = (values < lower) | (values > upper)
+    return pd.DataFrame(outliers, index=data.index, columns=data.columns)
 
 
-def _jitter(shape, dist, dtype=np.float64, positive=True):
-    if is_float_dtype(dtype):
-        if positive:
-            jitter = _rng.uniform(0, dist, shape).astype(dtype)
-        else:
-            jitter = _rng.uniform(dist * -1, dist, shape).astype(dtype)
-    elif is_integer_dtype(dtype):
-        dist = round(dist)
-        if positive:
-            jitter = _rng.integers(dist, size=shape, dtype=dtype, endpoint=True)
-        else:
-            jitter = _rng.integers(
-                dist * -1, high=dist, size=shape, dtype=dtype, endpoint=True
-            )
-    else:
-        raise ValueError(f"`dtype` must be either int or float dtype, got {dtype}")
-    return jitter
+def _jitter_loop(values, lower_outs, upper_outs, spans, is_int, draws):
+    # Walks outliers in row-major order, the order of `np.nonzero`.
+    k = 0
+    for i in range(values.shape[0]):
+        for j in range(values.shape[1]):
+            if lower_outs[i, j] or upper_outs[i, j]:
+                jitter = draws[k] * spans[j]
+                if is_int[j]:
+                    jitter = np.floor(jitter)
+                values[i, j] += jitter if lower_outs[i, j] else -jitter
+                k += 1
 
 
-def _jitter_like(data: pd.Series, dist: float, positive=True):
-    return _jitter(data.shape, dist, dtype=data.dtype, positive=positive)
+def _jitter_numpy(values, lower_outs, upper_outs, spans, is_int, draws):
+    rows, cols = np.nonzero(lower_outs | upper_outs)
+    jitter = draws * spans[cols]
+    jitter = np.where(is_int[cols], np.floor(jitter), jitter)
+    values[rows, cols] += np.where(lower_outs[rows, cols], jitter, -jitter)
 
 
-def _jitter_clipped(
-    clipped: pd.Series, lower_outs: pd.Series, upper_outs: pd.Series, dist: float
-):
-    lower_jitter = _jitter_like(clipped[lower_outs], dist)
-    upper_jitter = _jitter_like(clipped[upper_outs], dist)
-    jittered = clipped.copy()
-    jittered[lower_outs] += lower_jitter
-    jittered[upper_outs] -= upper_jitter
-    return jittered
+_jitter_kernel = _jitter_numpy if numba is None else numba.njit(_jitter_loop)
+
+
+def _add_jitter(values, lower_outs, upper_outs, dists, is_int, rng=None):
+    """Move clipped outliers back inside the fences by uniform noise, in place.
+
+    Lower outliers move up and upper outliers move down by up to `dists`
+    (whole numbers from 0 to `dists` inclusive in integer columns). One draw
+    covers every outlier in every column.
+
+    Args:
+        values (np.ndarray): Clipped float values, modified in place.
+        lower_outs (np.ndarray): Mask of values which were below the fences.
+        upper_outs (np.ndarray): Mask of values which were above the fences.
+        dists (np.ndarray): Maximum distance for each column.
+        is_int (np.ndarray): Whether each column is integer.
+        rng (np.random.Generator, optional): Generator or seed. Defaults to
+            the module generator.
+    """
+    rng = _rng if rng is None else np.random.default_rng(rng)
+    spans = np.where(is_int, np.round(dists) + 1, dists)
+    draws = rng.random(np.count_nonzero(lower_outs | upper_outs))
+    _jitter_kernel(values, lower_outs, upper_outs, spans, is_int, draws)
 
 
 @singledispatch
-def iqr_winsorize(data: pd.Series, silent=False):
+def iqr_winsorize(data: pd.Series, silent=False, return_report=False, optimize=False):
     """Reset outliers to outermost inlying values.
 
     Args:
         data (pd.Series): Series or DataFrame for clipping.
         silent (bool, optional): Do not display report. Defaults to False.
+        return_report (bool, optional): Also return an `OutlierReport`. Defaults to False.
+        optimize (bool, optional): Downcast the result (see
+            `utils.optimize_memory`). Defaults to False.
 
     Returns:
-        [pd.Series]: Series or DataFrame
+        [pd.Series]: Series or DataFrame, and the report if `return_report`.
     """
     outliers = iqr_outliers(data)
     min_in, max_in = data[~outliers].agg(["min", "max"])
-    if not silent:
-        _display_report(outliers, "clipped")
-    return data.clip(lower=min_in, upper=max_in)
+    report = _report(outliers, "clipped", silent)
+    clipped = data.clip(lower=min_in, upper=max_in)
+    if optimize:
+        clipped = utils.downcast(clipped)
+    return (clipped, report) if return_report else clipped
 
 
 @iqr_winsorize.register
-def _(data: pd.DataFrame, silent=False) -> pd.DataFrame:
+def _(data: pd.DataFrame, silent=False, return_report=False, optimize=False):
     """Function for DataFrames"""
-    clipped = data.apply(iqr_winsorize, silent=True)
-    if not silent:
-        _display_report(iqr_outliers(data), "clipped")
-    return clipped
+    values = _float_values(data)
+    min_in, max_in, outliers = _winsor_bounds(values)
+    clipped = _restore_dtypes(np.clip(values, min_in, max_in), data)
+    report = _report(pd.DataFrame(outliers, columns=data.columns), "clipped", silent)
+    if optimize:
+        clipped = utils.optimize_memory(clipped, silent=silent)
+    return (clipped, report) if return_report else clipped
 
 
 @singledispatch
-def iqr_clip(data: pd.Series, jitter=False, silent=False):
+def iqr_clip(
+    data: pd.Series,
+    jitter=False,
+    silent=False,
+    return_report=False,
+    rng=None,
+    optimize=False,
+):
     """Move outliers to the Tukey fences.
     Args:
         data (pd.Series): Series or DataFrame for clipping.
-        jitter (bool, optional): Add uniform noise. Defaults to False.
+        jitter (bool, optional): Add uniform noise, up to a fifth of the IQR,
+            to clipped values. Defaults to False.
         silent (bool, optional): Do not display report. Defaults to False.
+        return_report (bool, optional): Also return an `OutlierReport`. Defaults to False.
+        rng (np.random.Generator or int, optional): Generator or seed for the
+            jitter. Defaults to the module generator.
+        optimize (bool, optional): Downcast the result (see
+            `utils.optimize_memory`). Defaults to False.
     Returns:
-        [pd.Series]: Series or DataFrame
+        [pd.Series]: Series or DataFrame, and the report if `return_report`.
     """
-    lower, upper = iqr_fences(data)
-    clipped = data.clip(lower=lower, upper=upper)
-    if is_integer_dtype(data):
-        clipped = clipped.round().astype(data.dtype)
-    if not silent:
-        outliers = (data < lower) | (data > upper)
-        _display_report(outliers, "clipped")
-    if jitter:
-        dist = get_iqr(data) / 5
-        if is_integer_dtype(data):
-            dist = round(dist)
-        clipped = _jitter_clipped(clipped, data < lower, data > upper, dist)
-    return clipped
+    clipped, report = iqr_clip(
+        data.to_frame(),
+        jitter=jitter,
+        silent=silent,
+        return_report=True,
+        rng=rng,
+        optimize=optimize,
+    )
+    clipped = clipped.iloc[:, 0].rename(data.name)
+    return (clipped, report) if return_report else clipped
 
 
 @iqr_clip.register
-def _(data: pd.DataFrame, jitter=False, silent=False) -> pd.DataFrame:
+def _(
+    data: pd.DataFrame,
+    jitter=False,
+    silent=False,
+    return_report=False,
+    rng=None,
+    optimize=False,
+):
     """Function for DataFrames"""
-    clipped = data.apply(iqr_clip, jitter=jitter, silent=True)
-    if not silent:
-        _display_report(iqr_outliers(data), "clipped")
-    return clipped
+    values = _float_values(data)
+    lower, upper = _frame_fences(values)
+    lower_outs, upper_outs = values < lower, values > upper
+    clipped = np.clip(values, lower, upper)
+    if jitter:
+        is_int = data.dtypes.map(is_integer_dtype).to_numpy()
+        _add_jitter(clipped, lower_outs, upper_outs, (upper - lower) / 20, is_int, rng)
+    clipped = _restore_dtypes(clipped, data)
+    outliers = pd.DataFrame(lower_outs | upper_outs, columns=data.columns)
+    report = _report(outliers, "clipped", silent)
+    if optimize:
+        clipped = utils.optimize_memory(clipped, silent=silent)
+    return (clipped, report) if return_report else clipped
 
 
 @singledispatch
-def iqr_drop(data: pd.DataFrame, silent=False) -> pd.DataFrame:
+def iqr_drop(
+    data: pd.DataFrame, silent=False, return_report=False, optimize=False
+) -> pd.DataFrame:
     """Drop IQR-fence outliers from `data`.
 
     Args:
         data (pd.DataFrame): Series or DataFrame for removing outliers.
         silent (bool, optional): Do not display report. Defaults to False.
+        return_report (bool, optional): Also return an `OutlierReport`. Defaults to False.
+        optimize (bool, optional): Downcast the result (see
+            `utils.optimize_memory`). Defaults to False.
 
     Returns:
-        pd.DataFrame: Copy of `data` with outliers dropped.
+        pd.DataFrame: Copy of `data` with outliers dropped, and the report
+        if `return_report`.
     """
     outliers = iqr_outliers(data)
-    if not silent:
-        _display_report(outliers, "dropped")
-    return data.loc[~outliers.any(axis=1)].copy()
+    report = _report(outliers, "dropped", silent)
+    dropped = data.loc[~outliers.any(axis=1)].copy()
+    if optimize:
+        dropped = utils.optimize_memory(dropped, silent=silent)
+    return (dropped, report) if return_report else dropped
 
 
 @iqr_drop.register
-def _(data: pd.Series, silent=False) -> pd.Series:
+def _(data: pd.Series, silent=False, return_report=False, optimize=False) -> pd.Series:
     """Function for Series"""
     outliers = iqr_outliers(data)
-    if not silent:
-        _display_report(outliers, "dropped")
-    return data.loc[~outliers].copy()
+    report = _report(outliers, "dropped", silent)
+    dropped = data.loc[~outliers].copy()
+    if optimize:
+        dropped = utils.downcast(dropped)
+    return (dropped, report) if return_report else dropped
 
 
 @singledispatch
@@ -217,58 +365,435 @@ def _(data: pd.Series, thresh=3) -> pd.Series:
 
 
 @singledispatch
-def z_clip(data: pd.DataFrame, thresh=3, silent=False) -> pd.DataFrame:
+def z_clip(
+    data: pd.DataFrame, thresh=3, silent=False, return_report=False, optimize=False
+):
     """Move z-score outliers to z-score `thresh`.
 
     Args:
         data (pd.DataFrame): Series or DataFrame for clipping outliers.
         thresh (int, optional): Z-score threshold for outliers. Defaults to 3.
         silent (bool, optional): Do not display report. Defaults to False.
+        return_report (bool, optional): Also return an `OutlierReport`. Defaults to False.
+        optimize (bool, optional): Downcast the result (see
+            `utils.optimize_memory`). Defaults to False.
 
     Returns:
-        pd.DataFrame: Copy of Series or DataFrame with outliers clipped.
+        pd.DataFrame: Copy of Series or DataFrame with outliers clipped, and
+        the report if `return_report`.
     """
     ss = StandardScaler()
     z_data = ss.fit_transform(data)
+    outliers = pd.DataFrame(np.abs(z_data) > thresh, columns=data.columns)
     clipped = np.clip(z_data, -1 * thresh, thresh)
     clipped = ss.inverse_transform(clipped)
     clipped = pd.DataFrame(clipped, index=data.index, columns=data.columns)
-    if not silent:
-        _display_report(z_outliers(data), "clipped")
-    return clipped
+    report = _report(outliers, "clipped", silent)
+    if optimize:
+        clipped = utils.optimize_memory(clipped, silent=silent)
+    return (clipped, report) if return_report else clipped
 
 
 @z_clip.register
-def _(data: pd.Series, thresh=3, silent=False) -> pd.Series:
+def _(
+    data: pd.Series, thresh=3, silent=False, return_report=False, optimize=False
+) -> pd.Series:
     """Function for Series"""
-    clipped = z_clip(data.to_frame(), thresh=thresh, silent=True).squeeze()
-    if not silent:
-        _display_report(z_outliers(data), "clipped")
-    return clipped
+    clipped, report = z_clip(
+        data.to_frame(),
+        thresh=thresh,
+        silent=silent,
+        return_report=True,
+        optimize=optimize,
+    )
+    clipped = clipped.squeeze()
+    return (clipped, report) if return_report else clipped
 
 
 @singledispatch
-def z_drop(data: pd.DataFrame, thresh=3, silent=False) -> pd.DataFrame:
+def z_drop(
+    data: pd.DataFrame, thresh=3, silent=False, return_report=False, optimize=False
+):
     """Drop z-score outliers from `data`.
 
     Args:
         data (pd.DataFrame): Series or DataFrame for removing outliers.
         thresh (int, optional): Z-score threshold for outliers. Defaults to 3.
         silent (bool, optional): Do not display report. Defaults to False.
+        return_report (bool, optional): Also return an `OutlierReport`. Defaults to False.
+        optimize (bool, optional): Downcast the result (see
+            `utils.optimize_memory`). Defaults to False.
 
     Returns:
-        pd.DataFrame: Copy of Series or DataFrame with outliers dropped.
+        pd.DataFrame: Copy of Series or DataFrame with outliers dropped, and
+        the report if `return_report`.
     """
     outliers = z_outliers(data, thresh=thresh)
-    if not silent:
-        _display_report(outliers, "dropped")
-    return data.loc[~outliers.any(axis=1)].copy()
+    report = _report(outliers, "dropped", silent)
+    dropped = data.loc[~outliers.any(axis=1)].copy()
+    if optimize:
+        dropped = utils.optimize_memory(dropped, silent=silent)
+    return (dropped, report) if return_report else dropped
 
 
 @z_drop.register
-def _(data: pd.Series, thresh=3, silent=False) -> pd.Series:
+def _(
+    data: pd.Series, thresh=3, silent=False, return_report=False, optimize=False
+) -> pd.Series:
     """Function for Series"""
     outliers = z_outliers(data, thresh=thresh)
-    if not silent:
-        _display_report(outliers, "dropped")
-    return data.loc[~outliers].copy()
+    report = _report(outliers, "dropped", silent)
+    dropped = data.loc[~outliers].copy()
+    if optimize:
+        dropped = utils.downcast(dropped)
+    return (dropped, report) if return_report else dropped
+
+
+def _median(values: np.ndarray) -> np.ndarray:
+    """Returns the median of each column, selecting with `np.partition`."""
+    n = values.shape[0]
+    if n == 0 or np.isnan(values).any():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanmedian(values, axis=0)
+    kth = [(n - 1) // 2, n // 2]
+    middle = np.partition(values, kth, axis=0)[kth]
+    return middle.mean(axis=0)
+
+
+def _robust_center_scale(values: np.ndarray) -> tuple:
+    """Returns the median and normal-consistent MAD of each column.
+
+    Where the MAD is zero (over half the values are equal), the scaled mean
+    absolute deviation is used instead, and failing that 1.
+    """
+    center = _median(values)
+    deviation = np.abs(values - center)
+    scale = 1.4826 * _median(deviation)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_dev = 1.2533 * np.nanmean(deviation, axis=0)
+    scale = np.where(scale > 0, scale, mean_dev)
+    return center, np.where(scale > 0, scale, 1.0)
+
+
+@singledispatch
+def robust_z_outliers(data: pd.DataFrame, thresh=3.5) -> pd.DataFrame:
+    """Returns boolean mask of robust z-score outliers.
+
+    Robust z-scores use the median and median absolute deviation (MAD)
+    instead of the mean and standard deviation, so they are not inflated by
+    the outliers themselves.
+
+    Args:
+        data (pd.DataFrame): Series or DataFrame for finding outliers.
+        thresh (float, optional): Robust z-score threshold. Defaults to 3.5.
+
+    Returns:
+        pd.DataFrame: Series or DataFrame mask
+    """
+    values = _float_values(data)
+    center, scale = _robust_center_scale(values)
+    outliers = np.abs(values - center) > thresh * scale
+    return pd.DataFrame(outliers, index=data.index, columns=data.columns)
+
+
+@robust_z_outliers.register
+def _(data: pd.Series, thresh=3.5) -> pd.Series:
+    """Function for Series"""
+    return robust_z_outliers(data.to_frame(), thresh=thresh).squeeze()
+
+
+@singledispatch
+def robust_z_clip(
+    data: pd.DataFrame, thresh=3.5, silent=False, return_report=False, optimize=False
+):
+    """Move robust z-score outliers to robust z-score `thresh`.
+
+    Args:
+        data (pd.DataFrame): Series or DataFrame for clipping outliers.
+        thresh (float, optional): Robust z-score threshold. Defaults to 3.5.
+        silent (bool, optional): Do not display report. Defaults to False.
+        return_report (bool, optional): Also return an `OutlierReport`. Defaults to False.
+        optimize (bool, optional): Downcast the result (see
+            `utils.optimize_memory`). Defaults to False.
+
+    Returns:
+        pd.DataFrame: Copy of Series or DataFrame with outliers clipped, and
+        the report if `return_report`.
+    """
+    values = _float_values(data)
+    center, scale = _robust_center_scale(values)
+    lower, upper = center - thresh * scale, center + thresh * scale
+    outliers = pd.DataFrame((values < lower) | (values > upper), columns=data.columns)
+    clipped = _restore_dtypes(np.clip(values, lower, upper), data)
+    report = _report(outliers, "clipped", silent)
+    if optimize:
+        clipped = utils.optimize_memory(clipped, silent=silent)
+    return (clipped, report) if return_report else clipped
+
+
+@robust_z_clip.register
+def _(
+    data: pd.Series, thresh=3.5, silent=False, return_report=False, optimize=False
+) -> pd.Series:
+    """Function for Series"""
+    clipped, report = robust_z_clip(
+        data.to_frame(),
+        thresh=thresh,
+        silent=silent,
+        return_report=True,
+        optimize=optimize,
+    )
+    clipped = clipped.squeeze()
+    return (clipped, report) if return_report else clipped
+
+
+@singledispatch
+def robust_z_drop(
+    data: pd.DataFrame, thresh=3.5, silent=False, return_report=False, optimize=False
+):
+    """Drop robust z-score outliers from `data`.
+
+    Args:
+        data (pd.DataFrame): Series or DataFrame for removing outliers.
+        thresh (float, optional): Robust z-score threshold. Defaults to 3.5.
+        silent (bool, optional): Do not display report. Defaults to False.
+        return_report (bool, optional): Also return an `OutlierReport`. Defaults to False.
+        optimize (bool, optional): Downcast the result (see
+            `utils.optimize_memory`). Defaults to False.
+
+    Returns:
+        pd.DataFrame: Copy of Series or DataFrame with outliers dropped, and
+        the report if `return_report`.
+    """
+    outliers = robust_z_outliers(data, thresh=thresh)
+    report = _report(outliers, "dropped", silent)
+    dropped = data.loc[~outliers.any(axis=1)].copy()
+    if optimize:
+        dropped = utils.optimize_memory(dropped, silent=silent)
+    return (dropped, report) if return_report else dropped
+
+
+@robust_z_drop.register
+def _(
+    data: pd.Series, thresh=3.5, silent=False, return_report=False, optimize=False
+) -> pd.Series:
+    """Function for Series"""
+    outliers = robust_z_outliers(data, thresh=thresh)
+    report = _report(outliers, "dropped", silent)
+    dropped = data.loc[~outliers].copy()
+    if optimize:
+        dropped = utils.downcast(dropped)
+    return (dropped, report) if return_report else dropped
+
+
+class _FenceClipper(TransformerMixin, BaseEstimator):
+    """Base for clippers which learn per-column fences once and reuse them.
+
+    Subclasses implement `_fences`. Fitted clippers hold only two arrays of
+    fences, pickle like any scikit-learn estimator, and can be used in a
+    `Pipeline`, so new data is never requantiled. DataFrames come back as
+    DataFrames, with integer columns rounded back to their dtype.
+    """
+
+    # Whether `_sketch_fences` needs quantile sketches or only moments.
+    _needs_sketch = False
+
+    def _fences(self, values: np.ndarray) -> tuple:
+        raise NotImplementedError
+
+    def _sketch_fences(self, moments, sketch) -> tuple:
+        raise TypeError(f"{type(self).__name__} cannot be fit from streaming summaries")
+
+    def fit(self, X, y=None):
+        values = self._validate_data(
+            X, reset=True, dtype=np.float64, force_all_finite="allow-nan"
+        )
+        self.lower_, self.upper_ = self._fences(values)
+        return self
+
+    def transform(self, X):
+        check_is_fitted(self)
+        values = self._validate_data(
+            X, reset=False, dtype=np.float64, force_all_finite="allow-nan"
+        )
+        clipped = np.clip(values, self.lower_, self.upper_)
+        if isinstance(X, pd.DataFrame):
+            return _restore_dtypes(clipped, X)
+        return clipped
+
+    def outliers(self, X):
+        """Returns a boolean mask of values outside the fitted fences."""
+        check_is_fitted(self)
+        values = self._validate_data(
+            X, reset=False, dtype=np.float64, force_all_finite="allow-nan"
+        )
+        mask = (values < self.lower_) | (values > self.upper_)
+        if isinstance(X, pd.DataFrame):
+            return pd.DataFrame(mask, index=X.index, columns=X.columns)
+        return mask
+
+
+class IQRClipper(_FenceClipper):
+    """Fitted version of `iqr_clip`: moves outliers to the learned Tukey fences."""
+
+    _needs_sketch = True
+
+    def _fences(self, values):
+        return _frame_fences(values)
+
+    def _sketch_fences(self, moments, sketch):
+        q1, q3 = sketch.quantile([0.25, 0.75])
+        iqr = q3 - q1
+        return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+class IQRWinsorizer(_FenceClipper):
+    """Fitted version of `iqr_winsorize`: resets outliers to the learned
+    outermost inlying values."""
+
+    def _fences(self, values):
+        return _winsor_bounds(values)[:2]
+
+
+class ZClipper(_FenceClipper):
+    """Fitted version of `z_clip`: moves values beyond `thresh` standard
+    deviations from the learned mean to that distance.
+
+    Args:
+        thresh (float, optional): Z-score threshold for outliers. Defaults to 3.
+    """
+
+    def __init__(self, thresh=3):
+        self.thresh = thresh
+
+    def _fences(self, values):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = np.nanmean(values, axis=0)
+            std = np.nanstd(values, axis=0)
+        return self._z_fences(mean, std)
+
+    def _sketch_fences(self, moments, sketch):
+        return self._z_fences(moments.mean, moments.std())
+
+    def _z_fences(self, mean, std):
+        # Constant columns are left alone, like `StandardScaler` does.
+        std = np.where(std > 0, std, 1.0)
+        return mean - self.thresh * std, mean + self.thresh * std
+
+
+def iter_chunks(path: str, columns: list = None, chunksize: int = 100_000):
+    """Iterate over a CSV or Parquet file in DataFrame chunks.
+
+    Args:
+        path (str): Path to a ".csv" or ".parquet" file.
+        columns (list, optional): Columns to read. Defaults to all.
+        chunksize (int, optional): Rows per chunk. Defaults to 100_000.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of rows.
+    """
+    if path.endswith(".parquet"):
+        if pq is None:
+            raise ImportError("Reading Parquet requires `pyarrow`")
+        batches = pq.ParquetFile(path).iter_batches(chunksize, columns=columns)
+        for batch in batches:
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+def stream_fit(clipper, path: str, columns: list, chunksize=100_000, k=200):
+    """Fit `clipper` on a file too large for memory, in one pass.
+
+    Quartiles are estimated with KLL sketches and means and standard
+    deviations with running moments (see `sketches`), so IQR fences are
+    approximate and z-score fences exact up to rounding.
+
+    Args:
+        clipper (IQRClipper or ZClipper): Unfitted clipper.
+        path (str): Path to a ".csv" or ".parquet" file.
+        columns (list): Numeric columns to learn fences for.
+        chunksize (int, optional): Rows per chunk. Defaults to 100_000.
+        k (int, optional): Sketch level capacity; larger is more accurate.
+            Defaults to 200.
+
+    Raises:
+        TypeError: `clipper` has no fences from streaming summaries, e.g.
+            IQRWinsorizer. Raised before the file is read.
+
+    Returns:
+        IQRClipper or ZClipper: `clipper`, fitted.
+    """
+    if type(clipper)._sketch_fences is _FenceClipper._sketch_fences:
+        raise TypeError(
+            f"{type(clipper).__name__} cannot be fit from streaming summaries"
+        )
+    columns = list(columns)
+    moments = sketches.RunningMoments(len(columns))
+    sketch = sketches.KLLSketch(len(columns), k=k)
+    for chunk in iter_chunks(path, columns=columns, chunksize=chunksize):
+        values = _float_values(chunk[columns])
+        if clipper._needs_sketch:
+            sketch.update(values)
+        else:
+            moments.update(values)
+    clipper.lower_, clipper.upper_ = clipper._sketch_fences(moments, sketch)
+    clipper.feature_names_in_ = np.array(columns, dtype=object)
+    clipper.n_features_in_ = len(columns)
+    return clipper
+
+
+def stream_transform(clipper, src: str, dst: str, drop=False, chunksize=100_000):
+    """Clip or drop outliers chunk by chunk, writing every chunk to `dst`.
+
+    Only the columns `clipper` was fit on are checked; others pass through.
+
+    Args:
+        clipper (_FenceClipper): Fitted clipper, e.g. from `stream_fit`.
+        src (str): Path to a ".csv" or ".parquet" file.
+        dst (str): Output ".csv" or ".parquet" path.
+        drop (bool, optional): Drop rows with outliers instead of clipping.
+            Defaults to False.
+        chunksize (int, optional): Rows per chunk. Defaults to 100_000.
+
+    Returns:
+        OutlierReport: Outliers found in every chunk.
+    """
+    check_is_fitted(clipper)
+    columns = list(clipper.feature_names_in_)
+    counts, n_modified, n_rows = np.zeros(len(columns), dtype=np.int64), 0, 0
+    writer = None
+    try:
+        for i, chunk in enumerate(iter_chunks(src, chunksize=chunksize)):
+            outliers = clipper.outliers(chunk[columns])
+            has_outlier = outliers.any(axis=1)
+            counts += outliers.sum().to_numpy()
+            n_modified += has_outlier.sum()
+            n_rows += len(chunk)
+            if drop:
+                chunk = chunk.loc[~has_outlier]
+            else:
+                chunk[columns] = clipper.transform(chunk[columns])
+            if dst.endswith(".parquet"):
+                writer = _write_parquet(chunk, dst, writer)
+            else:
+                chunk.to_csv(dst, mode="a" if i else "w", header=not i, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    verb = "dropped" if drop else "clipped"
+    return OutlierReport(pd.Series(counts, index=columns), n_modified, n_rows, verb)
+
+
+def _write_parquet(chunk: pd.DataFrame, dst: str, writer=None):
+    """Append `chunk` to `dst`, opening a writer with its schema if needed."""
+    if pq is None:
+        raise ImportError("Writing Parquet requires `pyarrow`")
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    if writer is None:
+        writer = pq.ParquetWriter(dst, table.schema)
+    writer.write_table(table.cast(writer.schema))
+    return writer
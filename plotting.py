@@ -10,6 +10,8 @@ import statsmodels.api as sm
 from sklearn.preprocessing import minmax_scale
 from matplotlib import ticker
 
+import corrcache
+import fastols
 import utils
 import outliers
 
@@ -156,7 +158,8 @@ def pair_corr_heatmap(
 ):
     if not ignore:
         ignore = []
-    corr_df = data.drop(columns=ignore).corr()
+    numeric = data.drop(columns=ignore).select_dtypes(include=["number", "bool"])
+    corr_df = corrcache.get(numeric)
     title = "Correlations Between Features"
     if ax is None:
         figsize = figsize_like(corr_df, scale)
@@ -700,6 +703,7 @@ def frame_corr_heatmap(
     high_corr:float=None,
     scale: float = 0.85,
     no_prefix: bool = True,
+    sparse: bool = False,
     ax: plt.Axes = None,
     **kwargs,
 ) -> plt.Axes:
@@ -711,6 +715,8 @@ def frame_corr_heatmap(
         high_corr (float): Threshold for high correlation. Defaults to None.
         scale (float, optional): Multiplier for determining figsize. Defaults to 0.85.
         no_prefix (bool, optional): If only one cat, do not prefix dummies. Defaults to True.
+        sparse (bool, optional): Build dummies as a sparse matrix, e.g. for
+            high-cardinality features like zipcode. Defaults to False.
         ax (plt.Axes, optional): Axes to plot on. Defaults to None.
 
     Returns:
@@ -724,12 +730,22 @@ def frame_corr_heatmap(
         ylabel = "Categorical Features"
         single_cat = False
     title = "Correlation with Numeric Features"
-    cat_df = data.filter(categorical, axis=1)
-    if no_prefix and single_cat:
-        dummies = pd.get_dummies(cat_df, prefix="", prefix_sep="")
-    else:
-        dummies = pd.get_dummies(cat_df)
-    corr_df = dummies.apply(lambda x: data.corrwith(x))
+    categorical = [x for x in categorical if x in data.columns]
+    prefix = not (no_prefix and single_cat)
+    dummies = dict()
+    for column in categorical:
+        for level in fastols._levels(data[column]):
+            label = f"{column}_{level}" if prefix else f"{level}"
+            dummies[corrcache.dummy_name(column, level)] = label
+    numeric = data.select_dtypes(include=["number", "bool"]).columns
+    corr_df = corrcache.get(
+        data,
+        index=numeric,
+        columns=list(dummies),
+        categorical=categorical,
+        sparse=sparse,
+    )
+    corr_df = corr_df.rename(columns=dummies)
     if not transpose:
         corr_df = corr_df.T
     if high_corr is not None:
@@ -0,0 +1,416 @@
+"""Columnar storage for OLS sweep results.
+
+A sweep appends its summaries in row batches. With `pyarrow` installed the
+store is a Parquet dataset directory holding one part file per batch, which
+`pyarrow` reads back as a single table. Otherwise it is one file of consecutive
+`.npy` arrays: column names, formulae and a value matrix for each batch. Legacy
+sweeps wrote one JSON file per formula, which is still available as the "json"
+format.
+
+Each store has an index of finished formulas, keyed by a hash of the formula
+and a fingerprint of the swept data, so interrupted or extended sweeps only
+compute what is missing. Readers keep the newest row for each formula.
+"""
+import glob
+import hashlib
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+else:
+    import pyarrow.dataset as ds
+
+FORMATS = ("parquet", "npy", "json")
+EXTENSIONS = {"parquet": ".parquet", "npy": ".npy", "json": ""}
+
+# Scalar fields of `modeling.summarize`, split around the per-exog fields.
+HEAD_FIELDS = [
+    "rsquared",
+    "rsquared_adj",
+    "fval",
+    "f_pval",
+    "nobs",
+    "jb",
+    "jbpv",
+    "skew",
+    "kurtosis",
+    "omni",
+    "omnipv",
+    "condno",
+    "mineigval",
+]
+TAIL_FIELDS = [
+    "bp_lm",
+    "bp_lm_pval",
+    "bp_f_val",
+    "bp_f_pval",
+    "bp_hetero",
+    "high_corr_exog",
+    "bad_pvals",
+]
+DTYPES = {"bp_hetero": np.bool_, "high_corr_exog": np.int64, "bad_pvals": np.int64}
+
+
+def resolve_format(fmt: str = "auto") -> str:
+    """Returns `fmt`, or the best available columnar format for "auto"."""
+    if fmt == "auto":
+        return "parquet" if pa is not None else "npy"
+    if fmt not in FORMATS:
+        raise ValueError(f"`fmt` must be 'auto' or one of {FORMATS}, got '{fmt}'")
+    if fmt == "parquet" and pa is None:
+        raise ImportError("Writing Parquet requires `pyarrow`")
+    return fmt
+
+
+def store_path(root: str, fmt: str) -> str:
+    return f"{root}{EXTENSIONS[fmt]}"
+
+
+def index_path(path: str) -> str:
+    return f"{path}.index"
+
+
+def remove_store(path: str):
+    """Delete a columnar store, leaving legacy JSON directories alone."""
+    if path.endswith(".npy") and os.path.isfile(path):
+        os.remove(path)
+    elif path.endswith(".parquet") and os.path.isdir(path):
+        shutil.rmtree(path)
+
+
+def formula_key(formula: str, fingerprint: str) -> str:
+    """Returns the index key of `formula` fitted on data with `fingerprint`."""
+    digest = hashlib.blake2b(f"{fingerprint}:{formula}".encode(), digest_size=16)
+    return digest.hexdigest()
+
+
+class SweepIndex:
+    """On-disk set of finished formula keys, one hex key per line.
+
+    Args:
+        path (str): Index file, created on the first `add`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        if os.path.isfile(path):
+            with open(path) as file:
+                self.keys = set(file.read().split())
+        else:
+            self.keys = set()
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, keys: list):
+        if not keys:
+            return
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write("".join(f"{x}\n" for x in keys))
+        self._file.flush()
+        self.keys.update(keys)
+
+    def clear(self):
+        self.close()
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+        self.keys.clear()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def is_store(path: str) -> bool:
+    """Check whether `path` is a columnar store rather than a glob of JSON files."""
+    ext = os.path.splitext(path)[1]
+    return (ext == ".parquet" and os.path.isdir(path)) or (
+        ext == ".npy" and os.path.isfile(path)
+    )
+
+
+def schema(exog_names: list) -> list:
+    """Returns the ordered result columns for models drawn from `exog_names`.
+
+    Args:
+        exog_names (list): Every design column name, including "Intercept".
+
+    Returns:
+        list: Summary field names, with one p-value and coefficient per exog.
+    """
+    pvals = [f"pval_{x}" for x in exog_names]
+    coefs = [f"coef_{x}" for x in exog_names]
+    return HEAD_FIELDS + pvals + coefs + TAIL_FIELDS
+
+
+def _with_formulae(formulae, values: pd.DataFrame) -> pd.DataFrame:
+    """Returns `values` with schema dtypes and a leading "formula" column."""
+    values = values.astype({x: DTYPES[x] for x in values.columns if x in DTYPES})
+    formulae = pd.Series(formulae, index=values.index, name="formula")
+    return pd.concat([formulae, values], axis=1)
+
+
+def _batch_frame(formulae: list, rows: list, columns: list) -> pd.DataFrame:
+    return _with_formulae(formulae, pd.DataFrame(rows, columns=columns, dtype=float))
+
+
+class ResultWriter:
+    """Append-only writer for sweep summaries.
+
+    Args:
+        path (str): Destination ".npy" file, or directory for "parquet" and "json".
+        columns (list): Result columns, usually from `schema`.
+        fmt (str, optional): "parquet", "npy", or "json". Defaults to "parquet".
+        batch_size (int, optional): Rows buffered per written batch. Defaults to 2048.
+        index (SweepIndex, optional): Index which receives the keys of each
+            batch once it is written. Defaults to None.
+    """
+
+    def __init__(
+        self, path: str, columns: list, fmt="parquet", batch_size=2048, index=None
+    ):
+        self.path = path
+        self.columns = list(columns)
+        self.fmt = resolve_format(fmt)
+        self.batch_size = batch_size
+        self.index = index
+        self._formulae = []
+        self._rows = []
+        self._keys = []
+        if self.fmt == "npy":
+            self._file = open(path, "a+b")
+            # Drop a batch left half-written by an interrupted sweep.
+            self._file.seek(0)
+            for _ in _npy_batches(self._file):
+                pass
+            self._file.truncate(self._file.tell())
+            self._file.seek(0, os.SEEK_END)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._file = None
+
+    def append(self, formula: str, summary: pd.Series, key: str = None):
+        if self.fmt == "json":
+            summary.to_json(os.path.join(self.path, f"{formula}.json"))
+            if self.index is not None and key is not None:
+                self.index.add([key])
+            return
+        self._formulae.append(formula)
+        self._rows.append(summary.reindex(self.columns).to_list())
+        if key is not None:
+            self._keys.append(key)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        if self.fmt == "parquet":
+            df = _batch_frame(self._formulae, self._rows, self.columns)
+            self._write_part(pa.Table.from_pandas(df, preserve_index=False))
+        else:
+            np.save(self._file, np.array(self.columns), allow_pickle=False)
+            np.save(self._file, np.array(self._formulae), allow_pickle=False)
+            np.save(self._file, np.array(self._rows, dtype=np.float64))
+            self._file.flush()
+        # Only index rows which are safely on disk.
+        if self.index is not None:
+            self.index.add(self._keys)
+        self._formulae.clear()
+        self._rows.clear()
+        self._keys.clear()
+
+    def _write_part(self, table):
+        # Write under a hidden name and rename, so a killed sweep never
+        # leaves a truncated part where readers will find it.
+        names = map(os.path.basename, _parts(self.path))
+        number = max([int(re.sub(r"\D", "", x)) for x in names], default=-1) + 1
+        name = f"part-{number:06d}.parquet"
+        tmp_path = os.path.join(self.path, f".{name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+        if self.index is not None:
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _parts(path: str) -> list:
+    return sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+
+
+def _skip_npy(file):
+    """Seek past the next array in `file` without reading its data."""
+    version = np.lib.format.read_magic(file)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(file)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(file)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    if file.seek(nbytes, os.SEEK_CUR) > os.fstat(file.fileno()).st_size:
+        raise EOFError("Truncated array")
+
+
+def _npy_batches(file, values=True):
+    """Yields (columns, formulae, values) until the end or a truncated batch.
+
+    With `values=False` the value matrices are skipped and yielded as None.
+    """
+    size = os.fstat(file.fileno()).st_size
+    while file.tell() < size:
+        start = file.tell()
+        try:
+            batch = [np.load(file, allow_pickle=False) for _ in range(2)]
+            if values:
+                batch.append(np.load(file, allow_pickle=False))
+            else:
+                _skip_npy(file)
+                batch.append(None)
+        except (ValueError, EOFError):
+            file.seek(start)
+            return
+        yield batch
+
+
+def _read_npy(path: str, columns: list = None) -> pd.DataFrame:
+    formulae, batches = [], []
+    with open(path, "rb") as file:
+        for batch_columns, batch_formulae, values in _npy_batches(file):
+            batch = pd.DataFrame(values, columns=batch_columns.tolist())
+            if columns is not None:
+                batch = batch.reindex(columns=columns)
+            formulae.append(batch_formulae)
+            batches.append(batch)
+    if not batches:
+        return pd.DataFrame(columns=["formula"] + (columns or []))
+    return _with_formulae(
+        np.concatenate(formulae), pd.concat(batches, ignore_index=True)
+    )
+
+
+def _read_parquet(path: str, columns: list = None) -> pd.DataFrame:
+    if pq is None:
+        raise ImportError("Reading Parquet requires `pyarrow`")
+    parts = _parts(path)
+    if not parts:
+        return pd.DataFrame(columns=["formula"] + (columns or []))
+    # Sweeps with different terms append parts with different columns.
+    schema = pa.unify_schemas([pq.read_schema(x) for x in parts])
+    read_cols = None
+    if columns is not None:
+        read_cols = ["formula"] + [x for x in columns if x in schema.names]
+    table = ds.dataset(parts, schema=schema, format="parquet").to_table(read_cols)
+    df = table.to_pandas()
+    return df if columns is None else df.reindex(columns=["formula"] + columns)
+
+
+def read_results(path: str, columns: list = None) -> pd.DataFrame:
+    """Read a columnar sweep store in one pass.
+
+    Args:
+        path (str): Path to a ".parquet" dataset or ".npy" store.
+        columns (list, optional): Columns to load. Defaults to all.
+
+    Returns:
+        pd.DataFrame: Results indexed by formula.
+    """
+    if columns is not None:
+        columns = [x for x in columns if x != "formula"]
+    if path.endswith(".parquet"):
+        df = _read_parquet(path, columns)
+    else:
+        df = _read_npy(path, columns)
+    df = df.drop_duplicates("formula", keep="last")
+    return df.set_index("formula")
+
+
+def _latest_rows(formulae: pd.Series) -> np.ndarray:
+    """Returns a mask of the last row of each formula."""
+    return ~formulae.duplicated(keep="last").to_numpy()
+
+
+def iter_results(path: str, columns: list = None):
+    """Iterate over a columnar sweep store one stored batch at a time.
+
+    Only the formulae are read up front, to skip rows superseded later in
+    the store, so memory is bounded by the size of one batch.
+
+    Args:
+        path (str): Path to a ".parquet" dataset or ".npy" store.
+        columns (list, optional): Columns to load. Defaults to all.
+
+    Yields:
+        pd.DataFrame: Results indexed by formula.
+    """
+    if columns is not None:
+        columns = [x for x in columns if x != "formula"]
+    if path.endswith(".parquet"):
+        batches = _iter_parquet(path, columns)
+    else:
+        batches = _iter_npy(path, columns)
+    latest = _latest_rows(pd.Series(next(batches), dtype=object))
+    start = 0
+    for batch in batches:
+        keep = latest[start : start + len(batch)]
+        start += len(batch)
+        if keep.any():
+            yield batch.loc[keep].set_index("formula")
+
+
+def _iter_npy(path: str, columns: list = None):
+    # First yields every formula, then one DataFrame per stored batch.
+    with open(path, "rb") as file:
+        formulae = [x for _, x, _ in _npy_batches(file, values=False)]
+    yield np.concatenate(formulae) if formulae else []
+    with open(path, "rb") as file:
+        for batch_columns, batch_formulae, values in _npy_batches(file):
+            batch = pd.DataFrame(values, columns=batch_columns.tolist())
+            if columns is not None:
+                batch = batch.reindex(columns=columns)
+            yield _with_formulae(batch_formulae, batch)
+
+
+def _iter_parquet(path: str, columns: list = None):
+    # First yields every formula, then one DataFrame per record batch.
+    if pq is None:
+        raise ImportError("Reading Parquet requires `pyarrow`")
+    parts = _parts(path)
+    if not parts:
+        yield []
+        return
+    names = pa.unify_schemas([pq.read_schema(x) for x in parts]).names
+    if columns is not None:
+        names = ["formula"] + columns
+    # Walk the parts in order, since scanners may reorder record batches.
+    yield np.concatenate(
+        [pq.read_table(x, columns=["formula"]).column(0).to_numpy() for x in parts]
+    )
+    for part in parts:
+        part = pq.ParquetFile(part)
+        read_cols = [x for x in names if x in part.schema_arrow.names]
+        for batch in part.iter_batches(columns=read_cols):
+            yield batch.to_pandas().reindex(columns=names)
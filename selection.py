@@ -0,0 +1,281 @@
+"""Linear feature selection by updating one factorization instead of refitting.
+
+Both engines work on standardized predictors, which leaves the fitted values
+of every linear model with an intercept unchanged:
+
+* Recursive feature elimination keeps the inverse Gram matrix of the
+  surviving predictors and removes a predictor with a rank-one downdate, so
+  each elimination costs O(p^2) rather than a fresh least squares fit.
+* Forward selection keeps, for each cross-validation fold, the inverse Gram
+  matrix of the training rows. Every candidate is scored by bordering that
+  inverse with one column, and the held-out R-squared follows from the
+  Gram matrix of the test rows, without predicting row by row.
+
+Each engine runs to the end in one pass and returns the complete path, which
+is cached with the predictor matrix. Any number of features can then be read
+off without refitting. Results match `sklearn.feature_selection.RFE` and
+`SequentialFeatureSelector` with `LinearRegression` on predictors of full
+rank. Collinear predictors, e.g. dummies of nested categoricals, get
+minimum-norm coefficients like `fastols.GramOLS`, so their order can differ.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+import fastols
+import lstsq
+import utils
+
+CACHE_SIZE = 8
+# Relative pivot below which a column adds nothing to the span of the others.
+PIVOT_TOL = 1e-10
+_cache = OrderedDict()
+
+
+def _cached(key, compute):
+    """Returns `compute()`, remembered under `key` in a small LRU cache."""
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    value = compute()
+    _cache[key] = value
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return value
+
+
+def clear_cache():
+    """Forget every cached predictor matrix and path."""
+    _cache.clear()
+
+
+def predictors(data, target, dummify_cats=False, ignore=None, sparse=False) -> tuple:
+    """Returns the numeric predictor matrix and target of `data`, cached.
+
+    Args:
+        data (pd.DataFrame): Data for modeling.
+        target (str): Name of the endogenous variable.
+        dummify_cats (bool, optional): Add drop-first dummies of categorical
+            columns. Defaults to False.
+        ignore (list, optional): Columns to exclude. Defaults to None.
+        sparse (bool, optional): Store the dummies with `pd.SparseDtype`.
+            Defaults to False.
+
+    Returns:
+        tuple: Predictors (pd.DataFrame) and target (pd.Series).
+    """
+    ignore = tuple(sorted(ignore or ()))
+    key = ("predictors", utils.fingerprint(data), target, ignore, dummify_cats, sparse)
+
+    def compute():
+        frame = data.drop(columns=list(ignore))
+        x = frame.drop(columns=target)
+        if dummify_cats:
+            dummies = pd.get_dummies(
+                x.select_dtypes(include="category"),
+                drop_first=True,
+                sparse=sparse,
+                dtype=np.float64 if sparse else np.uint8,
+            )
+            x = pd.concat([x.select_dtypes(include="number"), dummies], axis=1)
+        else:
+            x = x.select_dtypes(include="number")
+        return x, frame[target]
+
+    return _cached(key, compute)
+
+
+def _standardize(x: np.ndarray) -> tuple:
+    mean = x.mean(axis=0)
+    std = x.std(axis=0)
+    std = np.where(std > 0, std, 1.0)
+    return (x - mean) / std, std
+
+
+def _matrix(x: pd.DataFrame):
+    """Returns `x` as a float array, or as CSC if it has sparse columns."""
+    is_sparse = x.dtypes.map(lambda t: isinstance(t, pd.SparseDtype)).to_numpy()
+    if not is_sparse.any():
+        return x.to_numpy(np.float64)
+    dense = sp.csc_matrix(x.loc[:, ~is_sparse].to_numpy(np.float64))
+    matrix = sp.hstack([dense, x.loc[:, is_sparse].sparse.to_coo()], format="csc")
+    order = np.argsort(np.r_[np.flatnonzero(~is_sparse), np.flatnonzero(is_sparse)])
+    return matrix[:, order]
+
+
+def rfe_path(x, y: np.ndarray) -> np.ndarray:
+    """Eliminate every predictor like `RFE(LinearRegression())`, one at a time.
+
+    While the surviving predictors are collinear, each step solves them with
+    `lstsq.pinv` instead, ranking by minimum-norm coefficients of the
+    standardized predictors, like `fastols.GramOLS`. Downdates resume once
+    the survivors have full rank.
+
+    Args:
+        x (np.ndarray or scipy.sparse matrix): (n_obs, n_features)
+            predictors. Sparse predictors are never densified.
+        y (np.ndarray): (n_obs,) target.
+
+    Returns:
+        np.ndarray: Feature indices in order of elimination, the survivor last.
+    """
+    if not sp.issparse(x):
+        x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    _, gram = fastols.centered_gram(x)
+    std = np.sqrt(np.diag(gram) / y.size)
+    std = np.where(std > 0, std, 1.0)
+    gram = gram / np.outer(std, std)
+    # Centering y alone centers the cross-products.
+    xy = (x.T @ (y - y.mean())) / std
+    alive = np.arange(x.shape[1])
+    inv, rank = lstsq.pinv(gram)
+    beta = inv @ xy
+    path = []
+    while alive.size > 1:
+        # RFE ranks by squared coefficients on the original scale.
+        drop = np.argsort((beta / std[alive]) ** 2)[0]
+        path.append(alive[drop])
+        keep = np.arange(alive.size) != drop
+        collinear = rank < alive.size
+        alive = alive[keep]
+        if collinear:
+            inv, rank = lstsq.pinv(gram[np.ix_(alive, alive)])
+            beta = inv @ xy[alive]
+            continue
+        col = inv[keep, drop]
+        beta = beta[keep] - col * beta[drop] / inv[drop, drop]
+        inv = inv[np.ix_(keep, keep)] - np.outer(col, col) / inv[drop, drop]
+        rank -= 1
+    return np.array(path + [alive[0]])
+
+
+def rfe_ranking(path: np.ndarray, n_features: int = None) -> np.ndarray:
+    """Returns `RFE.ranking_` for keeping `n_features`, from an `rfe_path`."""
+    n_total = path.size
+    n_features = n_total // 2 if n_features is None else n_features
+    n_steps = n_total - n_features
+    ranking = np.ones(n_total, dtype=np.int64)
+    ranking[path[:n_steps]] = n_steps + 1 - np.arange(n_steps)
+    return ranking
+
+
+def _kfold_masks(n_obs: int, cv: int) -> list:
+    """Test masks of unshuffled K-fold splits, sized like `sklearn` `KFold`."""
+    sizes = np.full(cv, n_obs // cv)
+    sizes[: n_obs % cv] += 1
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    masks = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        mask = np.zeros(n_obs, dtype=bool)
+        mask[start:stop] = True
+        masks.append(mask)
+    return masks
+
+
+class _Fold:
+    """Gram matrices of one CV fold, and the inverse for the selected columns."""
+
+    def __init__(self, w: np.ndarray, y: np.ndarray, test: np.ndarray):
+        w_test, y_test = w[test], y[test]
+        self.gram_test = w_test.T @ w_test
+        self.wy_test = w_test.T @ y_test
+        self.sst = ((y_test - y_test.mean()) ** 2).sum()
+        self.yy_test = y_test @ y_test
+        self.gram = w.T @ w - self.gram_test
+        self.wy = w.T @ y - self.wy_test
+        # Start from the intercept alone.
+        self.active = np.array([0])
+        self.inv = 1 / self.gram[:1, :1]
+        self.beta = self.inv @ self.wy[:1]
+
+    def _border(self, cand: np.ndarray) -> tuple:
+        """Returns the active and new coefficients of adding each of `cand`."""
+        cross = self.gram[np.ix_(self.active, cand)]
+        inv_cross = self.inv @ cross
+        pivot = self.gram[cand, cand] - np.einsum("ij,ij->j", cross, inv_cross)
+        dependent = pivot <= PIVOT_TOL * self.gram[cand, cand]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gamma = (self.wy[cand] - cross.T @ self.beta) / pivot
+        # A column in the span of the others leaves the fit as it is.
+        gamma = np.where(dependent, 0.0, gamma)
+        beta = self.beta[:, None] - inv_cross * gamma
+        return beta, gamma, pivot, inv_cross, dependent
+
+    def scores(self, cand: np.ndarray) -> np.ndarray:
+        """Held-out R-squared of adding each of `cand`."""
+        beta, gamma, *_ = self._border(cand)
+        active = self.active
+        gram_aa = self.gram_test[np.ix_(active, active)]
+        gram_ac = self.gram_test[np.ix_(active, cand)]
+        fit_y = beta.T @ self.wy_test[active] + gamma * self.wy_test[cand]
+        quad = (
+            np.einsum("ic,ij,jc->c", beta, gram_aa, beta)
+            + 2 * gamma * np.einsum("ic,ic->c", beta, gram_ac)
+            + gamma ** 2 * self.gram_test[cand, cand]
+        )
+        sse = self.yy_test - 2 * fit_y + quad
+        return 1 - sse / self.sst
+
+    def add(self, col: int):
+        cand = np.array([col])
+        beta, gamma, pivot, inv_cross, dependent = self._border(cand)
+        if dependent[0]:
+            return
+        inv_cross, pivot = inv_cross[:, 0], pivot[0]
+        inv = np.empty((self.active.size + 1,) * 2)
+        inv[:-1, :-1] = self.inv + np.outer(inv_cross, inv_cross) / pivot
+        inv[:-1, -1] = inv[-1, :-1] = -inv_cross / pivot
+        inv[-1, -1] = 1 / pivot
+        self.inv = inv
+        self.beta = np.append(beta[:, 0], gamma[0])
+        self.active = np.append(self.active, col)
+
+
+def forward_path(x: np.ndarray, y: np.ndarray, cv: int = 5) -> tuple:
+    """Add every predictor like `SequentialFeatureSelector(LinearRegression())`.
+
+    Args:
+        x (np.ndarray): (n_obs, n_features) predictors.
+        y (np.ndarray): (n_obs,) target.
+        cv (int, optional): Number of unshuffled folds. Defaults to 5.
+
+    Returns:
+        tuple: Feature indices in order of addition, and the mean held-out
+        R-squared after each addition.
+    """
+    z, _ = _standardize(np.asarray(x, dtype=np.float64))
+    w = np.column_stack([np.ones(z.shape[0]), z])
+    y = np.asarray(y, dtype=np.float64)
+    folds = [_Fold(w, y, mask) for mask in _kfold_masks(y.size, cv)]
+    remaining = np.arange(1, w.shape[1])
+    path, path_scores = [], []
+    while remaining.size:
+        scores = np.mean([fold.scores(remaining) for fold in folds], axis=0)
+        best = np.argmax(scores)
+        for fold in folds:
+            fold.add(remaining[best])
+        path.append(remaining[best] - 1)
+        path_scores.append(scores[best])
+        remaining = np.delete(remaining, best)
+    return np.array(path), np.array(path_scores)
+
+
+def cached_rfe_path(
+    data, target, dummify_cats=False, ignore=None, sparse=False
+) -> tuple:
+    """Returns the predictor names and `rfe_path` of `data`, cached."""
+    x, y = predictors(data, target, dummify_cats, ignore, sparse)
+    ignore = tuple(sorted(ignore or ()))
+    key = ("rfe", utils.fingerprint(data), target, ignore, dummify_cats, sparse)
+    return x.columns, _cached(key, lambda: rfe_path(_matrix(x), y.to_numpy()))
+
+
+def cached_forward_path(data, target, cv=5, ignore=None) -> tuple:
+    """Returns the predictor names and `forward_path` of `data`, cached."""
+    x, y = predictors(data, target, ignore=ignore)
+    ignore = tuple(sorted(ignore or ()))
+    key = ("forward", utils.fingerprint(data), target, ignore, cv)
+    return x.columns, _cached(key, lambda: forward_path(x.to_numpy(), y.to_numpy(), cv))
@@ -0,0 +1,198 @@
+"""Mergeable streaming summaries for data which does not fit in memory.
+
+Every summary can be merged with another of its kind, so partial results
+from separate chunks, files, or workers combine into one.
+"""
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """Running count, mean, and variance per column (Welford/Chan updates).
+
+    Args:
+        n_cols (int): Number of columns to track.
+    """
+
+    def __init__(self, n_cols: int):
+        self.count = np.zeros(n_cols)
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+
+    def update(self, values: np.ndarray):
+        """Add a (n_rows, n_cols) array of values, ignoring NaNs."""
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        count = (~np.isnan(values)).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(values, axis=0) / count
+            m2 = np.nansum((values - mean) ** 2, axis=0)
+        self._combine(count, np.nan_to_num(mean), m2)
+        return self
+
+    def merge(self, other: "RunningMoments"):
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0)
+            self.m2 = np.where(
+                total > 0, self.m2 + m2 + delta ** 2 * self.count * count / total, 0
+            )
+        self.count = total
+
+    def var(self, ddof: int = 0) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def std(self, ddof: int = 0) -> np.ndarray:
+        return np.sqrt(self.var(ddof))
+
+
+class KLLSketch:
+    """KLL-style quantile sketch, one per column, sharing one set of compactors.
+
+    Every level holds at most `k` rows. A full level is sorted column by
+    column and every other row (from a random offset) moves up a level with
+    twice the weight. Memory is O(k log(n / k)) rows and rank error is about
+    1 / k.
+
+    Args:
+        n_cols (int): Number of columns to track.
+        k (int, optional): Capacity of each level. Defaults to 200.
+        seed (int, optional): Seed for the compaction offsets. Defaults to None.
+    """
+
+    def __init__(self, n_cols: int, k: int = 200, seed=None):
+        self.n_cols = n_cols
+        self.k = k
+        self.count = 0
+        self._levels = [np.empty((0, n_cols))]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        """Add a (n_rows, n_cols) array of values. NaNs are ignored by queries."""
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        self.count += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch"):
+        for level, items in enumerate(other._levels):
+            if level == len(self._levels):
+                self._levels.append(np.empty((0, self.n_cols)))
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) >= self.k:
+                items = np.sort(items, axis=0)
+                # An odd row out stays behind, so weights always add up.
+                keep = len(items) % 2
+                self._levels[level] = items[len(items) - keep :]
+                items = items[: len(items) - keep]
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty((0, self.n_cols)))
+                promoted = items[self._rng.integers(2) :: 2]
+                self._levels[level + 1] = np.concatenate(
+                    [self._levels[level + 1], promoted]
+                )
+            level += 1
+
+    def quantile(self, q) -> np.ndarray:
+        """Estimate quantiles of each column.
+
+        Args:
+            q (float or array-like): Quantile(s) between 0 and 1.
+
+        Returns:
+            np.ndarray: (n_cols,) for scalar `q`, else (len(q), n_cols).
+        """
+        values = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(len(x), 2.0 ** i) for i, x in enumerate(self._levels)]
+        )
+        order = np.argsort(values, axis=0)
+        values = np.take_along_axis(values, order, axis=0)
+        weights = np.where(np.isnan(values), 0, weights[order])
+        cum_weights = np.cumsum(weights, axis=0)
+        totals = cum_weights[-1] if len(cum_weights) else np.zeros(self.n_cols)
+        q_arr = np.atleast_1d(q)
+        result = np.full((q_arr.size, self.n_cols), np.nan)
+        for i, quant in enumerate(q_arr):
+            idx = (cum_weights < quant * totals).sum(axis=0)
+            idx = np.minimum(idx, len(values) - 1)
+            found = totals > 0
+            result[i, found] = values[idx[found], np.flatnonzero(found)]
+        return result[0] if np.ndim(q) == 0 else result
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over hashed values.
+
+    Uses 2 ** `precision` one-byte registers; the relative error of `count`
+    is about 1.04 / sqrt(2 ** precision), i.e. 0.8% at the default.
+
+    Args:
+        precision (int, optional): Number of index bits, from 4 to 18. Defaults to 14.
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"`precision` must be from 4 to 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add an array or Series of hashable values. Nulls are skipped."""
+        values = pd.Series(values)
+        values = values[values.notna()]
+        if values.size:
+            self.update_hashes(pd.util.hash_array(values.to_numpy()))
+        return self
+
+    def update_hashes(self, hashes: np.ndarray):
+        """Add precomputed 64-bit hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        n_rest = 64 - self.precision
+        index = (hashes >> np.uint64(n_rest)).astype(np.intp)
+        rest = hashes & np.uint64((1 << n_rest) - 1)
+        # Position of the first 1-bit in the remaining bits.
+        rank = (n_rest - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> float:
+        """Estimate the number of distinct values added."""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m ** 2 / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        n_zero = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and n_zero:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = m * np.log(m / n_zero)
+        return float(estimate)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized `int.bit_length` for unsigned 64-bit integers."""
+    length = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= (np.uint64(1) << np.uint64(shift))
+        length += high * shift
+        x = np.where(high, x >> np.uint64(shift), x)
+    return length + (x > 0)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import modeling
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(200, 4)), columns=["a", "b", "c", "d"])
+    frame["price"] = frame.sum(axis=1) + rng.normal(size=200)
+    return frame
+
+
+@pytest.fixture
+def fitted(monkeypatch):
+    """Formulas fit by the "formula" engine."""
+    formulae, fit = [], modeling.ols
+
+    def ols(formula, data):
+        formulae.append(formula)
+        return fit(formula=formula, data=data)
+
+    monkeypatch.setattr(modeling, "ols", ols)
+    return formulae
+
+
+def test_resume_with_smaller_ignore_fits_only_new_formulas(data, fitted, tmp_path):
+    kwargs = dict(n_vars=2, dst=str(tmp_path), backend="serial", jobs=1)
+    modeling.ols_sweep(data, "price", ignore=["d"], **kwargs)
+    assert len(fitted) == 3
+    fitted.clear()
+    path = modeling.ols_sweep(data, "price", **kwargs)
+    assert sorted(fitted) == ["price~a+d", "price~b+d", "price~c+d"]
+    assert len(modeling.load_results_as_frame(path)) == 6
+
+
+def test_gram_resume_refits_when_ignored_column_has_missing_values(data, tmp_path):
+    data.loc[:9, "d"] = np.nan
+    kwargs = dict(n_vars=1, dst=str(tmp_path), engine="gram", jobs=1)
+    modeling.ols_sweep(data, "price", ignore=["d"], **kwargs)
+    path = modeling.ols_sweep(data, "price", **kwargs)
+    results = modeling.load_results_as_frame(path)
+    # Every model is refit on the rows where "d" is present.
+    assert (results["nobs"] == 190).all()
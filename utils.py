@@ -1,12 +1,20 @@
 import datetime
+import hashlib
 from time import perf_counter
 from collections.abc import Mapping
 import numpy as np
 import pandas as pd
 
+try:
+    from IPython.display import display
+except ImportError:
+    display = print
+
 NULL = frozenset([np.nan, pd.NA, None])
 DATE_FORMAT = "%Y-%m-%d"
 DATETIME_FORMAT = "%Y-%m-%dT%H-%M-%S"
+# Blocks of fused ufuncs in `transform` should fit in L2 cache.
+BLOCK_BYTES = 256 * 2 ** 10
 
 
 def numeric_cols(data: pd.DataFrame) -> list:
@@ -32,12 +40,173 @@ def cat_cols(data: pd.DataFrame) -> list:
     return data.columns[categorical].to_list()
 
 
-def transform(data: pd.DataFrame, pipe: list):
-    tr = data.to_numpy()
-    for func in pipe:
-        tr = func(tr)
-    display([x.__name__ for x in pipe])
-    return pd.DataFrame(tr, index=data.index, columns=data.columns)
+INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def downcast(data: pd.Series, cat_ratio: float = 0.5) -> pd.Series:
+    """Returns `data` in the smallest dtype which holds it exactly.
+
+    Integers get the narrowest signed type for their range, floats become
+    float32 only if no value changes, and objects become categorical if at
+    most `cat_ratio` of their values are distinct. Other dtypes are kept.
+
+    Args:
+        data (pd.Series): Series to downcast.
+        cat_ratio (float, optional): Most distinct values per row for objects
+            to become categorical, or 0 to keep objects. Defaults to 0.5.
+
+    Returns:
+        pd.Series: `data`, downcast if possible.
+    """
+    dtype = data.dtype
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) or dtype == bool:
+        return data
+    if pd.api.types.is_integer_dtype(dtype):
+        if data.empty:
+            return data
+        low, high = data.min(), data.max()
+        for int_type in INT_DTYPES:
+            info = np.iinfo(int_type)
+            if info.min <= low and high <= info.max:
+                break
+        return data if int_type().itemsize >= dtype.itemsize else data.astype(int_type)
+    if pd.api.types.is_float_dtype(dtype):
+        if dtype.itemsize <= 4:
+            return data
+        values = data.to_numpy()
+        narrow = values.astype(np.float32)
+        with np.errstate(over="ignore"):
+            exact = np.array_equal(values, narrow, equal_nan=True)
+        return pd.Series(narrow, index=data.index, name=data.name) if exact else data
+    if pd.api.types.is_object_dtype(dtype):
+        try:
+            n_unique = data.nunique(dropna=False)
+        except TypeError:
+            # Unhashable elements, e.g. lists.
+            return data
+        if cat_ratio > 0 and n_unique <= cat_ratio * data.size:
+            return data.astype("category")
+    return data
+
+
+def optimize_memory(
+    data: pd.DataFrame, cat_ratio: float = 0.5, silent=False, return_report=False
+):
+    """Downcast every column of `data` (see `downcast`) and report the savings.
+
+    Args:
+        data (pd.DataFrame): DataFrame to shrink.
+        cat_ratio (float, optional): Most distinct values per row for objects
+            to become categorical, or 0 to keep objects. Defaults to 0.5.
+        silent (bool, optional): Do not print the bytes saved. Defaults to False.
+        return_report (bool, optional): Also return the dtypes and bytes of
+            each column before and after. Defaults to False.
+
+    Returns:
+        pd.DataFrame: Downcast copy of `data`, and the report if `return_report`.
+    """
+    before = data.memory_usage(index=False, deep=True)
+    optimized = data.copy(deep=False)
+    for name, column in data.items():
+        narrow = downcast(column, cat_ratio=cat_ratio)
+        if narrow is not column:
+            optimized[name] = narrow
+    after = optimized.memory_usage(index=False, deep=True)
+    total, saved = before.sum(), before.sum() - after.sum()
+    if not silent:
+        pct = saved / total * 100 if total else 0.0
+        print(f"Saved {saved / 2 ** 20:,.2f} of {total / 2 ** 20:,.2f} MiB ({pct:.1f}%)")
+    if not return_report:
+        return optimized
+    report = pd.DataFrame(
+        {
+            "dtype_before": data.dtypes,
+            "dtype_after": optimized.dtypes,
+            "bytes_before": before,
+            "bytes_after": after,
+            "bytes_saved": before - after,
+        }
+    )
+    return optimized, report
+
+
+def _is_inplace_ufunc(func) -> bool:
+    return isinstance(func, np.ufunc) and func.nin == 1 and func.nout == 1
+
+
+def _step_name(func) -> str:
+    return getattr(func, "__name__", type(func).__name__)
+
+
+def transform(
+    data: pd.DataFrame,
+    pipe: list,
+    columns: list = None,
+    block_bytes: int = BLOCK_BYTES,
+    silent=False,
+    return_timing=False,
+):
+    """Apply a pipeline of array functions to `data`, with one copy of the values.
+
+    Consecutive unary ufuncs (e.g. `np.log1p`, `np.sqrt`) are fused: they run
+    in place, block by block, so each block stays in cache for all of them.
+    Other functions get the whole array and must return one of the same shape.
+
+    Args:
+        data (pd.DataFrame): Data to transform.
+        pipe (list): Functions taking and returning a 2D array.
+        columns (list, optional): Columns to transform. The rest are shared
+            with `data`, not copied. Defaults to all.
+        block_bytes (int, optional): Size of the blocks of fused ufuncs.
+            Defaults to BLOCK_BYTES.
+        silent (bool, optional): Do not display the time of each step. Defaults to False.
+        return_timing (bool, optional): Also return the time of each step. Defaults to False.
+
+    Returns:
+        pd.DataFrame: Transformed copy of `data`, and a Series of step times
+        if `return_timing`.
+    """
+    columns = data.columns if columns is None else pd.Index(columns)
+    values = data[columns].to_numpy(dtype=np.float64, copy=True)
+    block_size = max(1, block_bytes // values.itemsize)
+    seconds = np.zeros(len(pipe))
+    i = 0
+    while i < len(pipe):
+        if not _is_inplace_ufunc(pipe[i]):
+            start = perf_counter()
+            values = np.asarray(pipe[i](values))
+            if values.dtype.kind != "f" or not values.flags.writeable:
+                values = values.astype(np.float64)
+            seconds[i] += perf_counter() - start
+            i += 1
+            continue
+        stop = i
+        while stop < len(pipe) and _is_inplace_ufunc(pipe[stop]):
+            stop += 1
+        # Ufuncs are elementwise, so walk the buffer in memory order.
+        flat = values.ravel(order="A")
+        if not np.shares_memory(flat, values):
+            values = np.ascontiguousarray(values)
+            flat = values.ravel()
+        for offset in range(0, flat.size, block_size):
+            block = flat[offset : offset + block_size]
+            for j in range(i, stop):
+                start = perf_counter()
+                pipe[j](block, out=block)
+                seconds[j] += perf_counter() - start
+        i = stop
+    timing = pd.Series(
+        pd.to_timedelta(seconds, unit="s"), index=[_step_name(x) for x in pipe]
+    )
+    timing.index.name = "step"
+    if not silent:
+        display(timing)
+    if columns.equals(data.columns):
+        result = pd.DataFrame(values, index=data.index, columns=data.columns)
+    else:
+        result = data.copy(deep=False)
+        result[columns] = values
+    return (result, timing) if return_timing else result
 
 
 def filter_pipe(
@@ -60,6 +229,22 @@ def filter_pipe(
     return data
 
 
+def fingerprint(data: pd.DataFrame) -> str:
+    """Returns a hash of the index, columns, dtypes, and values of `data`.
+
+    Args:
+        data (pd.DataFrame): DataFrame to fingerprint.
+
+    Returns:
+        str: Hex digest which changes whenever `data` changes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(data.columns.to_list()).encode())
+    digest.update(repr(data.dtypes.astype(str).to_list()).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
 def get_groups(groupby: pd.core.groupby.DataFrameGroupBy):
     return {x: groupby.get_group(x) for x in groupby.groups}
 